@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : benchmarks/bench_frozen.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+"""
+Construction time and memory footprint of frozen photopoint/light curve instances,
+compared with the previous (__dict__ and getattr based) Frozen implementation
+reproduced below (BaselineFrozen, BaselinePhotoData, BaselinePlainPhotoPoint).
+Usage: python benchmarks/bench_frozen.py [number of photopoints, default: 1000000]
+"""
+
+import sys, time, gc, tracemalloc
+from types import MappingProxyType
+from ampel.base.PlainPhotoPoint import PlainPhotoPoint
+from ampel.base.PhotoData import PhotoData
+from ampel.base.LightCurve import LightCurve
+from ampel.base.flags.PhotoFlags import PhotoFlags
+
+
+class BaselineFrozen:
+	""" Frozen as of version 0.5.1 """
+
+	def __setattr__(self, key, value):
+		if getattr(self, "_%s__isfrozen" % self.__class__.__name__, None) is not None:
+			raise TypeError( "%r is a frozen instance " % self )
+		object.__setattr__(self, key, value)
+
+
+class BaselinePhotoData(BaselineFrozen):
+	""" PhotoData.__init__ as of version 0.5.1 """
+
+	def __init__(self, content, flags=None, read_only=True):
+		# pylint: disable=no-member
+		if flags is not None and PhotoFlags.INST_ZTF|PhotoFlags.SRC_IPAC in flags:
+			self.keywords = PhotoData.default_keywords['ZTFIPAC']
+		else:
+			self.keywords = {}
+		self.flags = flags
+		if read_only:
+			self.content = MappingProxyType(content)
+			self.__isfrozen = True
+		else:
+			self.content = content
+
+	def get_value(self, field_name):
+		return self.content[
+			self.keywords[field_name] if field_name in self.keywords
+			else field_name
+		]
+
+
+class BaselinePlainPhotoPoint(BaselinePhotoData):
+	""" """
+	pass
+
+
+def measure(label, n, build):
+	""" Prints the construction time and the memory allocated by build() """
+	gc.collect()
+	tracemalloc.start()
+	start = time.perf_counter()
+	ret = build()
+	elapsed = time.perf_counter() - start
+	size, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	print(
+		"%-32s %9.3fs  %8.1f MB  %6.1f bytes/object" % 
+		(label, elapsed, size / 2**20, size / n)
+	)
+	return ret
+
+
+def main(n):
+
+	flags = PhotoFlags.INST_ZTF | PhotoFlags.SRC_IPAC
+	contents = [
+		{'_id': i, 'jd': 2458000.5 + i, 'magpsf': 18., 'sigmapsf': 0.1, 'fid': 1 + i % 2}
+		for i in range(n)
+	]
+
+	# tracemalloc slows down execution, construction time is measured separately below
+	for label, klass in (("Baseline", BaselinePlainPhotoPoint), ("PlainPhotoPoint", PlainPhotoPoint)):
+		start = time.perf_counter()
+		pps = [klass(c, flags) for c in contents]
+		print("%-32s %9.3fs" % ("%s (untraced)" % label, time.perf_counter() - start))
+		del pps
+
+	base_pps = measure("Baseline", n, lambda: [BaselinePlainPhotoPoint(c, flags) for c in contents])
+	pps = measure("PlainPhotoPoint", n, lambda: [PlainPhotoPoint(c, flags) for c in contents])
+
+	nlc = n // 100
+	measure(
+		"LightCurve (100 points each)", nlc, 
+		lambda: [LightCurve(i, pps[i*100:(i+1)*100]) for i in range(nlc)]
+	)
+
+	for label, objs in (("Baseline.get_value", base_pps), ("PhotoData.get_value", pps)):
+		start = time.perf_counter()
+		for pp in objs:
+			pp.get_value('mag')
+		print("%-32s %9.3fs" % (label, time.perf_counter() - start))
+
+	try:
+		pps[0].content = None
+	except TypeError as e:
+		print("Frozen check:", e.__class__.__name__)
+
+
+if __name__ == "__main__":
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
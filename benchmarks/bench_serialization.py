@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : benchmarks/bench_serialization.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+"""
+Size and speed of the JSON (ampel.utils.json_serialization) and BSON
+(ampel.utils.bson_serialization) serialization of transient views.
+Usage: python benchmarks/bench_serialization.py [number of views, default: 2000]
+"""
+
+import sys, time, io
+from datetime import datetime, timezone
+from bson import Binary, ObjectId
+from ampel.base.TransientView import TransientView
+from ampel.base.LightCurve import LightCurve
+from ampel.base.PlainPhotoPoint import PlainPhotoPoint
+from ampel.base.PlainUpperLimit import PlainUpperLimit
+from ampel.base.Compound import Compound
+from ampel.base.ScienceRecord import ScienceRecord
+from ampel.base.flags.PhotoFlags import PhotoFlags
+from ampel.base.flags.TransientFlags import TransientFlags
+from ampel.utils import json_serialization, bson_serialization
+
+
+def build_view(tran_id, npp=30, nul=10):
+	""" Transient view with a single light curve/compound and science record """
+
+	flags = PhotoFlags.INST_ZTF | PhotoFlags.SRC_IPAC | PhotoFlags.BAND_ZTF_G
+	pps = [
+		PlainPhotoPoint(
+			{
+				'_id': tran_id * 1000 + i, 'candid': 600000000000000000 + tran_id * 1000 + i,
+				'jd': 2458000.5 + i * 0.7, 'magpsf': 18.3 + i * 0.013, 'sigmapsf': 0.087,
+				'fid': 1, 'ra': 264.19341, 'dec': 52.3311, 'rb': 0.8137, 'programid': 1
+			},
+			flags
+		)
+		for i in range(npp)
+	]
+	uls = [
+		PlainUpperLimit({'_id': -(tran_id * 1000 + i), 'jd': 2457990.5 + i, 'diffmaglim': 19.53, 'fid': 1}, flags)
+		for i in range(nul)
+	]
+
+	cid = Binary(tran_id.to_bytes(16, 'big'), 5)
+	comp = Compound(
+		id=cid, comp=[{'pp': pp.get_id()} for pp in pps], tier=0,
+		len=npp + nul, tranId=tran_id, lastJD=pps[-1].get_value('jd')
+	)
+	sr = ScienceRecord(
+		tran_id, 'SNCOSMO', cid,
+		[{'dt': 1539820800.0, 'output': {'z': 0.0513, 'chisq': 1.21, 'fit_results': {'x1': -0.52, 'c': 0.031}}}]
+	)
+	journal = (
+		{'dt': datetime(2018, 10, 18, tzinfo=timezone.utc), 'tier': 0, 'channels': ['HU_RANDOM'], 'runId': ObjectId()},
+	)
+
+	return TransientView(
+		tran_id, TransientFlags.INST_ZTF, journal, tran_names=['ZTF18aaaaaaa'],
+		latest_state=cid, photopoints=pps, upperlimits=uls, compounds=(comp,),
+		lightcurves=(LightCurve(cid, pps, uls, info={'tier': 0}),), t2records=(sr,), channel='HU_RANDOM'
+	)
+
+
+def measure(label, views, dump, load, fileobj):
+	""" Prints serialization/deserialization times and size """
+
+	start = time.perf_counter()
+	dump(views, fileobj)
+	dump_time = time.perf_counter() - start
+	size = fileobj.tell()
+
+	fileobj.seek(0)
+	start = time.perf_counter()
+	n = sum(1 for _ in load(fileobj))
+	load_time = time.perf_counter() - start
+
+	assert n == len(views)
+	print(
+		"%-6s dump: %7.3fs  load: %7.3fs  size: %8.2f MB  (%6.0f bytes/view)" %
+		(label, dump_time, load_time, size / 2**20, size / len(views))
+	)
+
+
+def main(n):
+
+	views = [build_view(i) for i in range(n)]
+	measure("JSON", views, json_serialization.dump, json_serialization.load, io.StringIO())
+	measure("BSON", views, bson_serialization.dump, bson_serialization.load, io.BytesIO())
+
+
+if __name__ == "__main__":
+	main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -8,5 +8,9 @@ setup(name='ampel-base',
           'ampel.base.dev',
           'ampel.base.flags',
           'ampel.utils',
-      ]
+      ],
+      extras_require={
+          'arrow': ['pyarrow'],
+          'pandas': ['pandas'],
+      }
 )
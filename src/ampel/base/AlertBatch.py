@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/AlertBatch.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import numpy as np
+from ampel.base.AmpelAlert import AmpelAlert
+from ampel.base.PhotoColumns import PhotoColumns
+from ampel.base.CompiledFilter import CompiledFilter
+
+
+class AlertBatch:
+	"""
+	Container for N AmpelAlert instances whose photopoints and upper limits
+	are concatenated into columnar arrays (see :py:class:`ampel.base.PhotoColumns.PhotoColumns`).
+	Points of alert i are located between offsets[i] and offsets[i+1].
+	Allows T0 units (see :py:meth:`ampel.base.abstract.AbsAlertFilter.AbsAlertFilter.apply_batch`)
+	to evaluate cuts on many alerts at once using a few numpy operations, for example:
+
+	.. sourcecode:: python
+
+		mask = batch.get_mask({'attribute': 'mag', 'operator': '<', 'value': 19})
+		accepted = batch.any(mask)
+	"""
+
+	def __init__(self, alerts):
+		"""
+		:param alerts: iterable of AmpelAlert instances
+		"""
+		self.alerts = tuple(alerts)
+		self.tran_ids = np.array([al.tran_id for al in self.alerts], dtype=object)
+		self.pps, self.pp_offsets = PhotoColumns.concatenate(
+			[al.pps for al in self.alerts]
+		)
+		self.uls, self.ul_offsets = PhotoColumns.concatenate(
+			[al.uls if al.uls is not None else () for al in self.alerts]
+		)
+		self._alert_index = {}
+
+
+	def __len__(self):
+		return len(self.alerts)
+
+
+	def __iter__(self):
+		return iter(self.alerts)
+
+
+	def __getitem__(self, idx):
+		return self.alerts[idx]
+
+
+	def get_offsets(self, upper_limits=False):
+		""" :returns: numpy array of length len(self)+1 """
+		return self.ul_offsets if upper_limits else self.pp_offsets
+
+
+	def get_columns(self, upper_limits=False):
+		""" :returns: PhotoColumns instance containing the points of all alerts """
+		return self.uls if upper_limits else self.pps
+
+
+	def get_alert_index(self, upper_limits=False):
+		"""
+		:returns: numpy array containing, for each point, the index of the alert it belongs to
+		"""
+		if upper_limits not in self._alert_index:
+			self._alert_index[upper_limits] = np.repeat(
+				np.arange(len(self.alerts)),
+				np.diff(self.get_offsets(upper_limits))
+			)
+		return self._alert_index[upper_limits]
+
+
+	def get_values(self, param_name, upper_limits=False):
+		"""
+		ex: batch.get_values("mag")
+		:returns: tuple (numpy array, numpy bool mask) both with one entry per point,
+		or None if no alert of this batch defines the provided parameter
+		"""
+		return self.get_columns(upper_limits).get_column(
+			AmpelAlert.alert_keywords.get(param_name, param_name)
+		)
+
+
+	def get_mask(self, filters, upper_limits=False):
+		"""
+		'filters' example: {'attribute': 'magpsf', 'operator': '<', 'value': 18}
+		:returns: numpy bool array flagging the points matching the provided filter(s)
+		"""
+		return CompiledFilter.for_mappings(
+			filters, AmpelAlert.alert_keywords
+		).mask(self.get_columns(upper_limits))
+
+
+	def count(self, point_mask=None, upper_limits=False):
+		"""
+		:param point_mask: numpy bool array with one entry per point (ex: returned by get_mask())
+		:returns: numpy array containing the number of (matching) points of each alert
+		"""
+		if point_mask is None:
+			return np.diff(self.get_offsets(upper_limits))
+		return np.bincount(
+			self.get_alert_index(upper_limits)[point_mask],
+			minlength=len(self.alerts)
+		)
+
+
+	def any(self, point_mask, upper_limits=False):
+		"""
+		:returns: numpy bool array flagging the alerts with at least one matching point
+		"""
+		return self.count(point_mask, upper_limits) > 0
+
+
+	def all(self, point_mask, upper_limits=False):
+		"""
+		:returns: numpy bool array flagging the alerts whose points all match.
+		Alerts without points are flagged as well.
+		"""
+		return self.count(point_mask, upper_limits) == self.count(None, upper_limits)
@@ -4,13 +4,20 @@
 # License           : BSD-3-Clause
 # Author            : vb <vbrinnel@physik.hu-berlin.de>
 # Date              : 14.12.2017
-# Last Modified Date: 14.09.2018
+# Last Modified Date: 18.10.2026
 # Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
 
-import operator
+import numpy as np
+from itertools import compress
 from types import MappingProxyType
 from ampel.base.Frozen import Frozen
+from ampel.base.PhotoColumns import PhotoColumns, to_column, flag_mask
+from ampel.base.CompiledFilter import CompiledFilter
+from ampel.base.KeywordAccessor import KeywordAccessor
+from ampel.base.TimeIndex import TimeIndex
+from ampel.base.BandIndex import BandIndex
 from ampel.base.flags.AmpelFlags import AmpelFlags
+from ampel.utils.tabular import columns_to_arrow, columns_to_pandas
 
 class AmpelAlert(Frozen):
 	"""
@@ -18,45 +25,65 @@ class AmpelAlert(Frozen):
 	(read-only convertion occurs in constructor).
 	During pipeline processing, an alert is loaded and its content used to instantiate this class. 
 	Then, the AmpelAlert instance is fed to every active T0 filter.
+
+	In columnar mode (constructor argument columnar=True), photopoints and upper limits 
+	are stored as numpy arrays (see :py:class:`ampel.base.PhotoColumns.PhotoColumns`).
+	get_values(), get_tuples() and get_ntuples() then return numpy arrays 
+	rather than tuples, while get_photopoints(), get_upperlimits() 
+	and apply_filter() still provide read-only dict-like elements.
 	"""
 
 	flags = AmpelFlags(0)
 	alert_keywords = {}
 	alert_kws_set = set()
 
-	ops = {
-		'>': operator.gt,
-		'<': operator.lt,
-		'>=': operator.ge,
-		'<=': operator.le,
-		'==': operator.eq,
-		'!=': operator.ne,
-		'is': operator.is_,
-		'is not': operator.is_not
-	}
+	ops = CompiledFilter.ops
+
+	__slots__ = ('tran_id', 'pps', 'uls', '_cache')
 
 
 	@staticmethod
-	def load_ztf_alert(arg):
+	def load_ztf_alert(arg, columnar=False):
 		"""	
-		Convenience method.
-		Do not use for production!
+		Convenience method returning the first alert contained in the provided avro file.
+		Use :py:class:`ampel.base.AvroAlertReader.AvroAlertReader` to process many alerts.
 		"""
-		import fastavro
-		with open(arg, "rb") as fo:
-			al = next(fastavro.reader(fo), None)
+		from ampel.base.AvroAlertReader import AvroAlertReader
+		return next(iter(AvroAlertReader(arg, columnar=columnar)), None)
 
-		if al.get('prv_candidates') is None:
-			return AmpelAlert(
-				al['objectId'], tuple([MappingProxyType(al['candidate'])]), None
-			)
+
+	@classmethod
+	def load_from_avro_content(cls, avro_content, columnar=False, pp_cache=None):
+		"""
+		Creates an instance from a dict containing the content of a ZTF IPAC avro alert.
+		Detections (prv_candidates with a candid) are appended to the 
+		'candidate' photopoint, the others are considered upper limits.
+		:param pp_cache: optional instance of :py:class:`ampel.base.PhotoPointCache.PhotoPointCache`
+		used to share read-only photopoints among alerts (ignored in columnar mode)
+		"""
+		pps = [avro_content['candidate']]
+		prv = avro_content.get('prv_candidates')
+
+		if prv is None:
+			uls = None
 		else:
-			pps = [MappingProxyType(d) for d in al['prv_candidates'] if d.get('candid') is not None]
-			pps.insert(0,  MappingProxyType(al['candidate']))
-			return AmpelAlert(
-				al['objectId'], tuple(pps), 
-				tuple(MappingProxyType(d) for d in al['prv_candidates'] if d.get('candid') is None)
-			)
+			uls = []
+			for el in prv:
+				if el.get('candid') is None:
+					uls.append(el)
+				else:
+					pps.append(el)
+
+		if columnar:
+			return cls(avro_content['objectId'], pps, uls, columnar=True)
+
+		return cls(
+			avro_content['objectId'], 
+			pp_cache.intern_all(pps) if pp_cache is not None 
+			else tuple(MappingProxyType(el) for el in pps), 
+			tuple(MappingProxyType(el) for el in uls) if uls is not None else None
+		)
+
 
 	@classmethod
 	def set_class_flags(cls, arg_flags):
@@ -84,6 +111,7 @@ class AmpelAlert(Frozen):
 		"""
 		cls.alert_keywords = alert_keywords
 		cls.alert_kws_set = set(alert_keywords.keys())
+		KeywordAccessor.clear_cache()
 
 
 	@classmethod
@@ -94,7 +122,7 @@ class AmpelAlert(Frozen):
 		return arg_flags in cls.flags
 
 
-	def __init__(self, tran_id, list_of_pps, list_of_uls=None):
+	def __init__(self, tran_id, list_of_pps, list_of_uls=None, columnar=False):
 		""" 
 		AmpelAlert constructor
 		Parameters:
@@ -102,26 +130,68 @@ class AmpelAlert(Frozen):
 		:param tran_id: the astronomical transient object ID, for ZTF IPAC alerts 'objectId'
 		:param list_of_pps: a flat list of photopoint dictionaries. 
 		Ampel makes sure that each dictionary contains an alFlags key 
+		:param columnar: if True, photopoints and upper limits are converted into 
+		:py:class:`ampel.base.PhotoColumns.PhotoColumns` instances
+		(PhotoColumns instances can also be provided directly).
+		Note that in columnar mode, get_values(), get_tuples(), get_ntuples() and get_columns()
+		consider None values as missing values (filters and dict-like elements do not).
 		"""
 		self.tran_id = tran_id
-		self.pps = list_of_pps
-		self.uls = list_of_uls
+
+		if columnar:
+			self.pps = (
+				list_of_pps if isinstance(list_of_pps, PhotoColumns) 
+				else PhotoColumns.from_dicts(list_of_pps)
+			)
+			self.uls = (
+				list_of_uls if list_of_uls is None or isinstance(list_of_uls, PhotoColumns) 
+				else PhotoColumns.from_dicts(list_of_uls)
+			)
+		else:
+			self.pps = list_of_pps
+			self.uls = list_of_uls
+
+		# Lazily computed structures (indexes, ...)
+		self._cache = {}
 
 		# Freeze this instance
-		self.__isfrozen = True
+		self._freeze()
+
+
+	def __getstate__(self):
+		"""
+		MappingProxyType instances cannot be pickled: read-only photopoints 
+		are pickled as dicts and wrapped again when unpickling
+		"""
+		state = Frozen.__getstate__(self)
+		state['_cache'] = {}
+		for k in ('pps', 'uls'):
+			if type(state[k]) is tuple:
+				state[k] = tuple(dict(el) for el in state[k])
+		return state
+
+
+	def __setstate__(self, state):
+		""" """
+		for k in ('pps', 'uls'):
+			if type(state[k]) is tuple:
+				state[k] = tuple(MappingProxyType(el) for el in state[k])
+		Frozen.__setstate__(self, state)
 
 
 	def get_values(self, param_name, filters=None, upper_limits=False):
 		"""
 		ex: instance.get_values("mag")
 		"""
-		if param_name in AmpelAlert.alert_keywords:
-			param_name = AmpelAlert.alert_keywords[param_name]
+		param_name = AmpelAlert.alert_keywords.get(param_name, param_name)
 
 		photo_objs = self._get_photo_objs(filters, upper_limits)
 		if photo_objs is None:
 			return None
 
+		if type(photo_objs) is PhotoColumns:
+			return photo_objs.get_values(param_name)
+
 		return tuple(el[param_name] for el in photo_objs if param_name in el)
 
 
@@ -129,20 +199,16 @@ class AmpelAlert(Frozen):
 		"""
 		ex: instance.get_tuples("obs_date", "mag")
 		"""
-		if param1 in AmpelAlert.alert_keywords:
-			param1 = AmpelAlert.alert_keywords[param1]
-
-		if param2 in AmpelAlert.alert_keywords:
-			param2 = AmpelAlert.alert_keywords[param2]
+		acc = KeywordAccessor.get_accessor(AmpelAlert.alert_keywords, (param1, param2))
 
 		photo_objs = self._get_photo_objs(filters, upper_limits)
 		if photo_objs is None:
 			return None
 
-		return tuple(
-			(el[param1], el[param2]) 
-			for el in photo_objs if param1 in el and param2 in el
-		)
+		if type(photo_objs) is PhotoColumns:
+			return photo_objs.get_ntuples(acc.keys)
+
+		return acc.select(photo_objs)
 
 
 	def get_ntuples(self, params, filters=None, upper_limits=False):
@@ -150,20 +216,253 @@ class AmpelAlert(Frozen):
 		:param params: list of strings
 		ex: instance.get_ntuples(["fid", "obs_date", "mag"])
 		"""
-		# If any of the provided parameter matches defined keyword mappings
-		if AmpelAlert.alert_kws_set & set(params):
-			for i, param in enumerate(params):
-				if param in AmpelAlert.alert_keywords:
-					params[i] = AmpelAlert.alert_keywords[param]
+		# Keyword mappings are resolved once per parameter tuple (params is left untouched)
+		acc = KeywordAccessor.get_accessor(AmpelAlert.alert_keywords, tuple(params))
 	
 		photo_objs = self._get_photo_objs(filters, upper_limits)
 		if photo_objs is None:
 			return None
 
-		return tuple(
-			tuple(el[param] for param in params) 
-			for el in photo_objs if all(param in el for param in params)
-		)
+		if type(photo_objs) is PhotoColumns:
+			return photo_objs.get_ntuples(acc.keys)
+
+		return acc.select(photo_objs)
+
+
+	def get_columns(self, fields=None, upper_limits=False):
+		"""
+		:param fields: list/tuple of field names (default: all fields of the points)
+		:param upper_limits: if True, upper limits are used instead of photopoints
+		:returns: dict: field name -> tuple (read-only numpy array, numpy bool mask).
+		In columnar mode, the arrays of the PhotoColumns instance are returned as is.
+		"""
+		photo_objs = self.uls if upper_limits else self.pps
+		if photo_objs is None:
+			return {field: to_column([]) for field in fields} if fields is not None else {}
+
+		if type(photo_objs) is not PhotoColumns:
+			key = ('columns', upper_limits)
+			cols = self._cache.get(key)
+			if cols is None:
+				cols = PhotoColumns.from_dicts(photo_objs)
+				self._cache[key] = cols
+			photo_objs = cols
+
+		if fields is None:
+			return dict(photo_objs.columns)
+
+		ret = {}
+		for field in fields:
+			col = photo_objs.get_column(AmpelAlert.alert_keywords.get(field, field))
+			ret[field] = col if col is not None else to_column([None] * len(photo_objs))
+		return ret
+
+
+	def to_arrow(self, fields=None, upper_limits=False):
+		"""
+		:returns: pyarrow.Table, see get_columns(). Requires the optional dependency pyarrow.
+		"""
+		return columns_to_arrow(self.get_columns(fields, upper_limits))
+
+
+	def to_pandas(self, fields=None, upper_limits=False):
+		"""
+		:returns: pandas.DataFrame, see get_columns(). Requires the optional dependency pandas.
+		"""
+		return columns_to_pandas(self.get_columns(fields, upper_limits))
+
+
+	def get_flags(self, upper_limits=False):
+		"""
+		:returns: tuple (read-only numpy int64 array containing the 'alFlags' value 
+		of each point, numpy bool array flagging the points defining 'alFlags')
+		"""
+		return self.get_columns(('alFlags', ), upper_limits)['alFlags']
+
+
+	def get_flag_mask(self, any_of=None, all_of=None, none_of=None, upper_limits=False):
+		"""
+		:param any_of: flag or list of flags, at least one of which must be set
+		:param all_of: flag or list of flags which must all be set
+		:param none_of: flag or list of flags which must not be set
+		:returns: numpy bool array flagging the points matching all provided criteria
+		(each criterion is evaluated using a single bitwise operation on get_flags())
+		"""
+		return flag_mask(*self.get_flags(upper_limits), any_of, all_of, none_of)
+
+
+	def get_flagged(self, any_of=None, all_of=None, none_of=None, upper_limits=False):
+		"""
+		:returns: the photopoints (or upper limits) matching all provided criteria 
+		(tuple of dicts, or PhotoColumns instance in columnar mode), see get_flag_mask()
+		"""
+		photo_objs = self.uls if upper_limits else self.pps
+		if photo_objs is None:
+			return None
+
+		mask = self.get_flag_mask(any_of, all_of, none_of, upper_limits)
+		if type(photo_objs) is PhotoColumns:
+			return photo_objs.select(mask)
+
+		return tuple(compress(photo_objs, mask))
+
+
+	def get_window(self, start=None, end=None, upper_limits=False):
+		"""
+		Returns the photopoints (or upper limits if upper_limits is True) 
+		with start <= obs_date <= end, sorted by obs_date 
+		(tuple of dicts, or PhotoColumns instance in columnar mode).
+		start/end: None means unbounded.
+		Runs in O(log n + k) using a time index built on first use.
+		"""
+		return self._get_time_slice(upper_limits, 'get_slice', start, end)
+
+
+	def get_before(self, obs_date, upper_limits=False, inclusive=False):
+		"""
+		Returns the photopoints (or upper limits) observed before obs_date, sorted by obs_date
+		"""
+		return self._get_time_slice(upper_limits, 'get_before_slice', obs_date, inclusive)
+
+
+	def get_after(self, obs_date, upper_limits=False, inclusive=False):
+		"""
+		Returns the photopoints (or upper limits) observed after obs_date, sorted by obs_date
+		"""
+		return self._get_time_slice(upper_limits, 'get_after_slice', obs_date, inclusive)
+
+
+	def _get_time_slice(self, upper_limits, method, *args):
+		""" """
+		photo_objs = self.uls if upper_limits else self.pps
+		if photo_objs is None:
+			return None
+
+		ti = self._get_time_index(upper_limits)
+		sl = getattr(ti, method)(*args)
+
+		if type(photo_objs) is PhotoColumns:
+			return photo_objs.select(ti.get_positions(sl))
+
+		return ti.get_items(sl)
+
+
+	def _get_time_index(self, upper_limits):
+		"""
+		:returns: cached TimeIndex instance referencing the points defining 'obs_date'
+		"""
+		key = ('time_index', upper_limits)
+		ti = self._cache.get(key)
+		if ti is not None:
+			return ti
+
+		photo_objs = self.uls if upper_limits else self.pps
+		obs_date = AmpelAlert.alert_keywords.get('obs_date', 'obs_date')
+
+		if type(photo_objs) is PhotoColumns:
+			col = photo_objs.get_column(obs_date)
+			if col is None:
+				ti = TimeIndex([])
+			else:
+				# positions of points defining obs_date, ordered by obs_date
+				pos = col[1].nonzero()[0]
+				ti = TimeIndex(col[0][pos].tolist(), positions=pos.tolist())
+		else:
+			objs = [el for el in photo_objs if obs_date in el]
+			ti = TimeIndex([el[obs_date] for el in objs], objs)
+
+		self._cache[key] = ti
+		return ti
+
+
+	def get_band(self, band, upper_limits=False):
+		"""
+		Returns the photopoints (or upper limits if upper_limits is True) 
+		observed in the provided band, in original order 
+		(tuple of dicts, or PhotoColumns instance in columnar mode).
+		:param band: filter id (ZTF: 1, 2 or 3) or band flag (ex: PhotoFlags.BAND_ZTF_G)
+		The partition by band is computed once, on first use.
+		"""
+		photo_objs = self.uls if upper_limits else self.pps
+		if photo_objs is None:
+			return None
+
+		fid = BandIndex.get_fid(band)
+		bi = self._get_band_index(upper_limits)
+
+		if type(photo_objs) is PhotoColumns:
+			key = ('band', fid, upper_limits)
+			ret = self._cache.get(key)
+			if ret is None:
+				ret = photo_objs.select(bi.get_positions(fid))
+				self._cache[key] = ret
+			return ret
+
+		return bi.get_items(fid)
+
+
+	def get_bands(self, upper_limits=False):
+		""" Returns the sorted tuple of the filter ids of the points """
+		if (self.uls if upper_limits else self.pps) is None:
+			return ()
+		return self._get_band_index(upper_limits).get_bands()
+
+
+	def get_band_arrays(self, band, params, upper_limits=False):
+		"""
+		Columnar representation of the provided parameters for the points of the provided band.
+		ex: (jds, mags), mask = instance.get_band_arrays(2, ['obs_date', 'mag'])
+		:returns: tuple (tuple of read-only numpy arrays with one entry per point of the band, 
+		numpy bool array flagging the points defining all parameters), or None if no points
+		"""
+		photo_objs = self.uls if upper_limits else self.pps
+		if photo_objs is None:
+			return None
+
+		fid = BandIndex.get_fid(band)
+		key = ('band_columns', fid, upper_limits)
+		cols = self._cache.get(key)
+		if cols is None:
+			cols = self.get_band(fid, upper_limits)
+			if type(cols) is not PhotoColumns:
+				cols = PhotoColumns.from_dicts(cols)
+			self._cache[key] = cols
+
+		arrays = []
+		mask = np.ones(len(cols), dtype=bool)
+		for param in params:
+			col = cols.get_column(AmpelAlert.alert_keywords.get(param, param))
+			if col is None:
+				col = to_column([None] * len(cols))
+			arrays.append(col[0])
+			mask &= col[1]
+
+		return tuple(arrays), mask
+
+
+	def _get_band_index(self, upper_limits):
+		"""
+		:returns: cached BandIndex instance (filter ids: 'filter_id' values, default key: 'fid')
+		"""
+		key = ('band_index', upper_limits)
+		bi = self._cache.get(key)
+		if bi is not None:
+			return bi
+
+		photo_objs = self.uls if upper_limits else self.pps
+		fid_key = AmpelAlert.alert_keywords.get('filter_id', 'fid')
+
+		if type(photo_objs) is PhotoColumns:
+			col = photo_objs.get_column(fid_key)
+			bi = BandIndex(
+				[None] * len(photo_objs) if col is None 
+				else [v if m else None for v, m in zip(col[0].tolist(), col[1].tolist())]
+			)
+		else:
+			bi = BandIndex([el.get(fid_key) for el in photo_objs], photo_objs)
+
+		self._cache[key] = bi
+		return bi
 
 
 	def _get_photo_objs(self, filters, upper_limits):
@@ -177,12 +476,12 @@ class AmpelAlert(Frozen):
 
 
 	def get_photopoints(self):
-		""" returns a list of dicts """
+		""" returns a list of dicts (or a PhotoColumns instance in columnar mode) """
 		return self.pps
 
 
 	def get_upperlimits(self):
-		""" returns a list of dicts """
+		""" returns a list of dicts (or a PhotoColumns instance in columnar mode) """
 		return self.uls
 
 
@@ -195,31 +494,14 @@ class AmpelAlert(Frozen):
 
 	def apply_filter(self, match_objs, filters):
 		"""
+		:param match_objs: tuple of dicts or PhotoColumns instance
+		:param filters: dict or list/tuple of dicts, compiled and cached (see CompiledFilter)
+		:returns: tuple of matching dicts or, if match_objs is a PhotoColumns instance, 
+		a PhotoColumns instance containing the matching rows
 		"""
+		compiled_filter = CompiledFilter.for_mappings(filters, AmpelAlert.alert_keywords)
 
-		if type(filters) in (dict, MappingProxyType):
-			filters = [filters]
-		else:
-			if filters is None or type(filters) not in (list, tuple):
-				raise ValueError("filters must be of type dict or list/tuple")
-
-		for filter_el in filters:
-
-			operator = AmpelAlert.ops[
-				filter_el['operator']
-			]
-
-			filter_attr_name = filter_el['attribute']
-			attr_name = (
-				filter_attr_name if not filter_attr_name in AmpelAlert.alert_keywords 
-				else AmpelAlert.alert_keywords[filter_attr_name]
-			)
-
-			match_objs = tuple(
-				filter(
-					lambda el: attr_name in el and operator(el[attr_name], filter_el['value']), 
-					match_objs
-				)
-			)
+		if type(match_objs) is PhotoColumns:
+			return match_objs.select(compiled_filter.mask(match_objs))
 
-		return match_objs
+		return compiled_filter(match_objs)
@@ -0,0 +1,429 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/AvroAlertReader.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import io, os, json, zlib, tarfile, threading
+from queue import Queue, Full
+import fastavro
+from ampel.base.AmpelAlert import AmpelAlert
+
+# Avro object container file format (see the Avro specification),
+# defined here rather than imported from fastavro internals
+MAGIC = b'Obj\x01'
+SYNC_SIZE = 16
+_header_schema = fastavro.parse_schema({
+	'type': 'record', 'name': 'org.apache.avro.file.Header',
+	'fields': [
+		{'name': 'magic', 'type': {'type': 'fixed', 'name': 'magic', 'size': len(MAGIC)}},
+		{'name': 'meta', 'type': {'type': 'map', 'values': 'bytes'}},
+		{'name': 'sync', 'type': {'type': 'fixed', 'name': 'sync', 'size': SYNC_SIZE}}
+	]
+})
+
+class AvroAlertReader:
+	"""
+	Streaming reader yielding AmpelAlert instances from avro alert files (ZTF IPAC format).
+
+	Sources can be avro files, directories (scanned recursively for .avro files
+	and tar archives), tar archives (optionally compressed) containing avro files,
+	file-like objects or any iterable of those.
+
+	- Files are read in bulk (one read call per file / archive member)
+	  and processed one after the other, so that memory usage remains flat.
+	- Avro container headers are parsed by this class and writer schemas are parsed
+	  only once per distinct schema (ZTF stores the full schema in each single-alert file).
+	- With prefetch > 0, decoding happens in a background thread which keeps up
+	  to 'prefetch' alerts ahead of the consumer, so that decoding overlaps with filtering.
+	- An optional projection restricts decoding to the fields actually used.
+	  Projected-out fields (the cutouts above all) are skipped by the decoder 
+	  without being materialized (see build_projection()).
+
+	Example:
+
+	.. sourcecode:: python
+
+		for alert in AvroAlertReader("/data/ztf_public_20181018.tar.gz", prefetch=100):
+			res = t0_filter.apply(alert)
+	"""
+
+	#: Suffixes of files considered when scanning directories
+	avro_suffixes = ('.avro', )
+	tar_suffixes = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+
+	#: Top level fields always decoded when a projection is used
+	alert_base_fields = {'objectId', 'candid', 'candidate', 'prv_candidates'}
+
+	@staticmethod
+	def build_projection(alert_filters=(), cutouts=False):
+		"""
+		Builds a projection containing the fields referenced by AmpelAlert.alert_keywords
+		and the fields declared by the provided filters (see AbsAlertFilter.alert_fields).
+
+		:param alert_filters: AbsAlertFilter instances or classes
+		:param cutouts: whether cutouts should be decoded
+		:returns: dict with keys 'alert' (top level fields), 'candidate' and 'prv_candidates'
+		(candidate fields) and values sets of field names. A missing key means that 
+		all fields of the corresponding record part are decoded.
+		"""
+		proj = {
+			'alert': set(AvroAlertReader.alert_base_fields) | (
+				{'cutoutScience', 'cutoutTemplate', 'cutoutDifference'} if cutouts else set()
+			)
+		}
+
+		fields = {'candid'} | set(AmpelAlert.alert_keywords.values())
+		for alert_filter in alert_filters:
+			if alert_filter.alert_fields is None:
+				return proj
+			fields.update(
+				AmpelAlert.alert_keywords.get(f, f) for f in alert_filter.alert_fields
+			)
+
+		proj['candidate'] = fields
+		proj['prv_candidates'] = fields
+		return proj
+
+
+	def __init__(self, 
+		sources, alert_class=AmpelAlert, columnar=False, prefetch=0, 
+		projection=None, pp_cache=None, logger=None
+	):
+		"""
+		:param sources: path (str / os.PathLike), file-like object or iterable of those
+		:param alert_class: class whose method load_from_avro_content() is used
+		to create alerts from the decoded avro records (AmpelAlert or DevAmpelAlert)
+		:param columnar: see AmpelAlert constructor
+		:param prefetch: number of alerts decoded ahead in a background thread (0: no thread)
+		:param projection: dict, see build_projection(). None: all fields are decoded
+		:param pp_cache: optional instance of :py:class:`ampel.base.PhotoPointCache.PhotoPointCache`
+		making alerts share identical photopoints (dict mode only)
+		:param logger: instance of logging.Logger
+		"""
+		self.sources = (
+			[sources] if isinstance(sources, (str, os.PathLike)) or hasattr(sources, 'read')
+			else sources
+		)
+		self.alert_class = alert_class
+		self.columnar = columnar
+		self.prefetch = prefetch
+		self.projection = projection
+		self.pp_cache = pp_cache
+		self.logger = logger
+		self.files = 0
+		self.alerts = 0
+
+		# raw writer schema (bytes) -> (parsed writer schema, parsed reader schema or None)
+		self._schemas = {}
+
+
+	def __iter__(self):
+		if self.prefetch > 0:
+			return self._prefetch_alerts()
+		return self._read_alerts()
+
+
+	def _read_alerts(self):
+		""" """
+		load = self.alert_class.load_from_avro_content
+		columnar = self.columnar
+		pp_cache = self.pp_cache
+		for rec in self.iter_records():
+			self.alerts += 1
+			yield load(rec, columnar, pp_cache)
+
+
+	def _prefetch_alerts(self):
+		"""
+		Runs _read_alerts in a background thread feeding a bounded queue
+		"""
+		queue = Queue(maxsize=self.prefetch)
+		stop = threading.Event()
+		done = object()
+
+		def put(item):
+			# gives up if the consumer went away
+			while not stop.is_set():
+				try:
+					queue.put(item, timeout=0.1)
+					return True
+				except Full:
+					continue
+			return False
+
+		def produce():
+			try:
+				for alert in self._read_alerts():
+					if not put(alert):
+						return
+				put(done)
+			except BaseException as e:
+				put(e)
+
+		thread = threading.Thread(target=produce, name="AvroAlertReader", daemon=True)
+		thread.start()
+
+		try:
+			while True:
+				item = queue.get()
+				if item is done:
+					break
+				if isinstance(item, BaseException):
+					raise item
+				yield item
+		finally:
+			stop.set()
+
+
+	def iter_records(self):
+		"""
+		:returns: generator of decoded avro records (dict instances)
+		"""
+		for source in self.sources:
+			for fo in self._iter_fileobjs(source):
+				self.files += 1
+				yield from self._read_container(fo)
+
+		if self.logger is not None:
+			self.logger.info(
+				"%i alerts read from %i files (%i distinct schemas)" %
+				(self.alerts, self.files, len(self._schemas))
+			)
+			if self.pp_cache is not None:
+				self.logger.info("Photopoint cache: %s" % self.pp_cache.get_stats())
+
+
+	def _iter_fileobjs(self, source):
+		"""
+		:returns: generator of in-memory file objects (io.BytesIO) each containing one avro file.
+		Their attribute 'name' identifies the origin of the data in error messages.
+		"""
+		if hasattr(source, 'read'):
+			yield _named_bytes_io(source.read(), getattr(source, 'name', repr(source)))
+			return
+
+		path = os.fspath(source)
+
+		if os.path.isdir(path):
+			for root, dirs, files in os.walk(path):
+				dirs.sort()
+				for fname in sorted(files):
+					if fname.endswith(self.avro_suffixes + self.tar_suffixes):
+						yield from self._iter_fileobjs(os.path.join(root, fname))
+
+		elif path.endswith(self.tar_suffixes):
+			# stream mode: members are read sequentially without seeking
+			with tarfile.open(path, mode='r|*') as tar:
+				for member in tar:
+					if member.isfile() and member.name.endswith(self.avro_suffixes):
+						yield _named_bytes_io(
+							tar.extractfile(member).read(), "%s:%s" % (path, member.name)
+						)
+
+		else:
+			with open(path, 'rb') as f:
+				yield _named_bytes_io(f.read(), path)
+
+
+	def _get_schemas(self, raw_schema):
+		""" :returns: tuple (writer schema, reader schema), cached by raw schema """
+		schemas = self._schemas.get(raw_schema)
+		if schemas is None:
+			writer_schema = json.loads(raw_schema)
+			schemas = (
+				fastavro.parse_schema(writer_schema),
+				fastavro.parse_schema(project_schema(writer_schema, self.projection))
+				if self.projection is not None else None
+			)
+			self._schemas[raw_schema] = schemas
+		return schemas
+
+
+	def _read_container(self, fo):
+		"""
+		Decodes an avro object container file.
+		:param fo: io.BytesIO instance
+		:returns: generator of records
+		:raises ValueError: if the container is truncated or corrupt
+		"""
+		name = getattr(fo, 'name', '<avro data>')
+		try:
+			header = fastavro.schemaless_reader(fo, _header_schema)
+		except (EOFError, IndexError) as e:
+			# fastavro raises either of these depending on where the data ends
+			raise ValueError("%s: truncated avro header (%s)" % (name, e)) from None
+		if header['magic'] != MAGIC:
+			raise ValueError("%s: not an avro file (wrong magic bytes)" % name)
+
+		meta = header['meta']
+		codec = meta.get('avro.codec', b'null')
+		schema, reader_schema = self._get_schemas(meta['avro.schema'])
+
+		if codec not in (b'null', b'deflate'):
+			# let fastavro handle less common codecs
+			fo.seek(0)
+			yield from fastavro.reader(fo, reader_schema)
+			return
+
+		sync = header['sync']
+		buf = fo.getbuffer()
+		end = len(buf)
+
+		nblock = 0
+		while fo.tell() < end:
+
+			start = fo.tell()
+			try:
+				count = _read_long(fo)
+				size = _read_long(fo)
+			except ValueError as e:
+				raise ValueError("%s: block %i (byte %i): %s" % (name, nblock, start, e)) from None
+
+			if fo.tell() + size + SYNC_SIZE > end:
+				raise ValueError(
+					"%s: block %i (byte %i): truncated data (%i bytes announced, %i available)" %
+					(name, nblock, start, size + SYNC_SIZE, end - fo.tell())
+				)
+
+			if codec == b'null':
+				for i in range(count):
+					yield fastavro.schemaless_reader(fo, schema, reader_schema)
+			else:
+				pos = fo.tell()
+				block = io.BytesIO(zlib.decompress(buf[pos:pos + size], -15))
+				fo.seek(pos + size)
+				for i in range(count):
+					yield fastavro.schemaless_reader(block, schema, reader_schema)
+
+			if fo.read(SYNC_SIZE) != sync:
+				raise ValueError(
+					"%s: block %i (byte %i): avro sync marker mismatch" % (name, nblock, start)
+				)
+			nblock += 1
+
+		del buf
+
+
+def _named_bytes_io(data, name):
+	""" :returns: io.BytesIO instance with attribute 'name' """
+	fo = io.BytesIO(data)
+	fo.name = name
+	return fo
+
+
+def _read_long(fo):
+	"""
+	Reads a zig-zag encoded variable length long
+	:raises ValueError: if the end of fo is reached before the end of the value
+	"""
+	start = fo.tell()
+	try:
+		b = fo.read(1)[0]
+		n = b & 0x7F
+		shift = 7
+		while b & 0x80:
+			b = fo.read(1)[0]
+			n |= (b & 0x7F) << shift
+			shift += 7
+	except IndexError:
+		raise ValueError(
+			"truncated data (variable length long starting at byte %i, end reached at byte %i)" %
+			(start, fo.tell())
+		) from None
+	return (n >> 1) ^ -(n & 1)
+
+
+def project_schema(schema, projection):
+	"""
+	Derives a reader schema containing only the projected fields from a ZTF alert writer schema.
+	Fields absent from the reader schema are skipped by the avro decoder.
+
+	:param schema: writer schema (dict, as stored in the avro file header)
+	:param projection: dict, see AvroAlertReader.build_projection()
+	:returns: reader schema (dict)
+	"""
+	schema = dict(schema)
+
+	if 'alert' in projection:
+		keep = projection['alert']
+		fields = [f for f in schema['fields'] if f['name'] in keep]
+		removed = [f for f in schema['fields'] if f['name'] not in keep]
+
+		# Named types defined by a removed field but referenced by a kept field
+		# (ex: cutoutTemplate referencing the 'cutout' record defined by cutoutScience)
+		# must be defined in the first kept field referencing it
+		defs = {}
+		for f in removed:
+			_collect_named_types(f['type'], defs)
+		schema['fields'] = [dict(f, type=_inline_named_types(f['type'], defs)) for f in fields]
+
+	for part in ('candidate', 'prv_candidates'):
+		if part not in projection:
+			continue
+		keep = projection[part]
+		schema['fields'] = [
+			dict(f, type=_project_record(f['type'], keep)) if f['name'] == part else f
+			for f in schema['fields']
+		]
+
+	return schema
+
+
+def _project_record(avro_type, keep):
+	""" Restricts the fields of the record (possibly nested in unions/arrays) to 'keep' """
+	if isinstance(avro_type, list):
+		return [_project_record(el, keep) for el in avro_type]
+	if isinstance(avro_type, dict):
+		if avro_type.get('type') == 'array':
+			return dict(avro_type, items=_project_record(avro_type['items'], keep))
+		if avro_type.get('type') == 'record':
+			return dict(avro_type, fields=[f for f in avro_type['fields'] if f['name'] in keep])
+	return avro_type
+
+
+def _collect_named_types(avro_type, defs):
+	""" Collects named type definitions (name and full name -> definition) """
+	if isinstance(avro_type, list):
+		for el in avro_type:
+			_collect_named_types(el, defs)
+	elif isinstance(avro_type, dict):
+		if avro_type.get('type') in ('record', 'enum', 'fixed'):
+			name = avro_type['name']
+			defs[name] = avro_type
+			defs[name.split('.')[-1]] = avro_type
+			if 'namespace' in avro_type:
+				defs['%s.%s' % (avro_type['namespace'], name)] = avro_type
+			for f in avro_type.get('fields', ()):
+				_collect_named_types(f['type'], defs)
+		elif avro_type.get('type') == 'array':
+			_collect_named_types(avro_type['items'], defs)
+		elif avro_type.get('type') == 'map':
+			_collect_named_types(avro_type['values'], defs)
+
+
+def _inline_named_types(avro_type, defs):
+	""" Replaces the first reference to each named type of 'defs' with its definition """
+	if isinstance(avro_type, list):
+		return [_inline_named_types(el, defs) for el in avro_type]
+	if isinstance(avro_type, str):
+		if avro_type in defs:
+			definition = defs[avro_type]
+			for k in [k for k, v in defs.items() if v is definition]:
+				del defs[k]
+			return definition
+		return avro_type
+	if isinstance(avro_type, dict):
+		if avro_type.get('type') == 'array':
+			return dict(avro_type, items=_inline_named_types(avro_type['items'], defs))
+		if avro_type.get('type') == 'map':
+			return dict(avro_type, values=_inline_named_types(avro_type['values'], defs))
+		if avro_type.get('type') == 'record':
+			return dict(
+				avro_type, 
+				fields=[dict(f, type=_inline_named_types(f['type'], defs)) for f in avro_type['fields']]
+			)
+	return avro_type
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/BandIndex.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import numpy as np
+from ampel.base.flags.PhotoFlags import PhotoFlags
+
+
+class BandIndex:
+	"""
+	Partition of photopoints (or upper limits) by photometric band, computed in a single pass.
+	Bands are identified by filter id (ZTF: 'fid', 1: g, 2: r, 3: i).
+	Used (and cached) by the frozen LightCurve and AmpelAlert instances.
+	"""
+
+	__slots__ = ('positions', 'items')
+
+	#: band flags and their corresponding filter id
+	band_flags = (
+		(PhotoFlags.BAND_ZTF_G, 1),
+		(PhotoFlags.BAND_ZTF_R, 2),
+		(PhotoFlags.BAND_ZTF_I, 3)
+	)
+
+	_fids = {int(flag): fid for flag, fid in band_flags}
+
+
+	@classmethod
+	def get_fid(cls, band):
+		"""
+		:param band: filter id or band flag (ex: PhotoFlags.BAND_ZTF_G)
+		:returns: filter id
+		"""
+		if isinstance(band, PhotoFlags):
+			fid = cls._fids.get(int(band))
+			if fid is None:
+				raise ValueError("Unknown band flag: %s" % band)
+			return fid
+		return band
+
+
+	@classmethod
+	def get_flag_fid(cls, flags):
+		"""
+		:param flags: PhotoFlags instance (or None)
+		:returns: filter id of the first band flag contained in flags, or None
+		"""
+		if flags is None:
+			return None
+		for flag, fid in cls.band_flags:
+			if flag in flags:
+				return fid
+		return None
+
+
+	def __init__(self, fids, objs=None):
+		"""
+		:param fids: sequence of filter ids (None: unknown band)
+		:param objs: optional sequence of objects associated with the provided filter ids
+		"""
+		positions = {}
+		for i, fid in enumerate(fids):
+			if fid is not None:
+				positions.setdefault(fid, []).append(i)
+
+		self.positions = {}
+		for fid, pos in positions.items():
+			arr = np.array(pos, dtype=np.int64)
+			arr.flags.writeable = False
+			self.positions[fid] = arr
+
+		self.items = {
+			fid: tuple(objs[i] for i in pos) for fid, pos in positions.items()
+		} if objs is not None else None
+
+
+	def extended(self, fids, objs=None, offset=0):
+		"""
+		:param fids: filter ids of the added objects
+		:param objs: added objects (must be provided if this instance references objects)
+		:param offset: position of the first added object
+		:returns: new BandIndex instance referencing the objects of this instance and the added ones
+		"""
+		new = BandIndex(fids, objs)
+		bi = BandIndex.__new__(BandIndex)
+		bi.positions = dict(self.positions)
+		bi.items = dict(self.items) if self.items is not None else None
+
+		for fid, pos in new.positions.items():
+			arr = pos + offset
+			if fid in bi.positions:
+				arr = np.concatenate((bi.positions[fid], arr))
+			arr.flags.writeable = False
+			bi.positions[fid] = arr
+			if bi.items is not None:
+				bi.items[fid] = bi.items.get(fid, ()) + new.items[fid]
+
+		return bi
+
+
+	def get_bands(self):
+		""" :returns: sorted tuple of the filter ids present """
+		return tuple(sorted(self.positions))
+
+
+	def get_positions(self, band):
+		""" :returns: read-only numpy array of the positions of the objects in the provided band """
+		ret = self.positions.get(BandIndex.get_fid(band))
+		return ret if ret is not None else np.zeros(0, dtype=np.int64)
+
+
+	def get_items(self, band):
+		""" :returns: tuple of the objects in the provided band """
+		return self.items.get(BandIndex.get_fid(band), ())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/ChunkedSequence.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+from bisect import bisect_right
+from itertools import chain, islice
+from collections.abc import Sequence
+
+
+class ChunkedSequence(Sequence):
+	"""
+	Immutable sequence made of tuple chunks, shared between instances.
+	extended() returns a new instance referencing the chunks of the current one
+	plus a chunk containing the added elements, the current instance being left untouched.
+	Consecutive chunks are merged as long as the last chunk is not smaller
+	than its predecessor, keeping the number of chunks logarithmic
+	(each element is copied O(log n) times over successive extensions).
+	Indexed access bisects the chunk offsets: O(log n_chunks) per lookup,
+	iteration is linear.
+	Used by LightCurve.extend().
+	"""
+
+	__slots__ = ('chunks', 'offsets')
+
+
+	def __init__(self, chunks=()):
+		"""
+		:param chunks: sequence of tuples
+		"""
+		self.chunks = tuple(c for c in chunks if c)
+		offsets = [0]
+		for c in self.chunks:
+			offsets.append(offsets[-1] + len(c))
+		self.offsets = offsets
+
+
+	def extended(self, elements):
+		"""
+		:param elements: iterable of elements to append
+		:returns: new ChunkedSequence instance
+		"""
+		chunks = list(self.chunks)
+		chunks.append(tuple(elements))
+		while len(chunks) > 1 and len(chunks[-2]) <= len(chunks[-1]):
+			last = chunks.pop()
+			chunks[-1] = chunks[-1] + last
+		return ChunkedSequence(chunks)
+
+
+	def __len__(self):
+		return self.offsets[-1]
+
+
+	def __iter__(self):
+		return chain.from_iterable(self.chunks)
+
+
+	def __getitem__(self, idx):
+		if isinstance(idx, slice):
+			start, stop, step = idx.indices(len(self))
+			if step > 0:
+				return tuple(islice(self, start, stop, step))
+			return tuple(self)[idx]
+		if idx < 0:
+			idx += len(self)
+		if not 0 <= idx < len(self):
+			raise IndexError("ChunkedSequence index out of range")
+		i = bisect_right(self.offsets, idx) - 1
+		return self.chunks[i][idx - self.offsets[i]]
+
+
+	def __eq__(self, other):
+		if isinstance(other, (ChunkedSequence, tuple)):
+			return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+		return NotImplemented
+
+
+	def __hash__(self):
+		return hash(tuple(self))
+
+
+	def __repr__(self):
+		return "ChunkedSequence(%i elements, %i chunks)" % (len(self), len(self.chunks))
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/CompiledFilter.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import operator
+import numpy as np
+from enum import IntFlag
+from threading import Lock
+from collections import OrderedDict
+from types import MappingProxyType
+
+
+def has_bits(a, v):
+	""" 
+	Operator 'in': True if all the bits of v are set in a (works element-wise for numpy arrays)
+	ex: {'attribute': 'alFlags', 'operator': 'in', 'value': PhotoFlags.BAND_ZTF_G}
+	"""
+	return (a & v) == v
+
+
+class CompiledFilter:
+	"""
+	Filter specification(s) such as {'attribute': 'magpsf', 'operator': '<', 'value': 18}
+	compiled into a single predicate function (and a vectorized mask function for columnar data).
+	Compiled instances are cached (LRU, see max_size) using a hashable form of the filter
+	specification, so that the operator lookup, keyword resolution and predicate creation
+	happen only once per distinct specification.
+
+	Two flavors exist:
+
+	- for_mappings(): elements are dict-like objects (used by AmpelAlert),
+	  attribute names are resolved using the provided keyword mapping at compile time.
+	- for_photo_data(): elements are PhotoData instances (used by LightCurve),
+	  attribute names are resolved by the elements themselves, except for 
+	  'alFlags' (see flags_attribute) which refers to the attribute 'flags' of the elements.
+
+	Flag values (IntFlag instances) are converted to int at compile time.
+	"""
+
+	ops = {
+		'>': operator.gt,
+		'<': operator.lt,
+		'>=': operator.ge,
+		'<=': operator.le,
+		'==': operator.eq,
+		'!=': operator.ne,
+		'is': operator.is_,
+		'is not': operator.is_not,
+		'in': has_bits
+	}
+
+	#: Attribute name referring to the flags of PhotoData instances (for_photo_data())
+	flags_attribute = 'alFlags'
+
+	#: Maximum number of compiled filters kept in cache
+	max_size = 1024
+
+	_cache = OrderedDict()
+	_lock = Lock()
+
+
+	@classmethod
+	def for_mappings(cls, filters, keywords=None):
+		"""
+		:param filters: dict or list/tuple of dicts
+		:param keywords: dict mapping ampel keywords to the keys of the elements to be filtered.
+		The dict instance is referenced by the compiled filter and should not be modified in place.
+		:returns: CompiledFilter instance
+		"""
+		return cls._get(filters, False, keywords)
+
+
+	@classmethod
+	def for_photo_data(cls, filters):
+		"""
+		:param filters: dict or list/tuple of dicts
+		:returns: CompiledFilter instance
+		"""
+		return cls._get(filters, True, None)
+
+
+	@classmethod
+	def clear_cache(cls):
+		""" """
+		with cls._lock:
+			cls._cache.clear()
+
+
+	@classmethod
+	def _get(cls, filters, photo_data, keywords):
+		""" """
+		if type(filters) in (dict, MappingProxyType):
+			filters = (filters, )
+		elif filters is None or type(filters) not in (list, tuple):
+			raise ValueError("filters must be of type dict or list/tuple")
+
+		try:
+			# The keywords dict is referenced by the cached instance, its id can thus not be recycled
+			key = (photo_data, id(keywords)) + tuple(cls._get_key(el) for el in filters)
+			hash(key)
+		except TypeError:
+			# unhashable or identity-dependent filter values
+			return cls(filters, photo_data, keywords)
+
+		with cls._lock:
+			cf = cls._cache.get(key)
+			if cf is not None:
+				cls._cache.move_to_end(key)
+				return cf
+
+		cf = cls(filters, photo_data, keywords)
+
+		with cls._lock:
+			cls._cache[key] = cf
+			if len(cls._cache) > cls.max_size:
+				cls._cache.popitem(last=False)
+
+		return cf
+
+
+	@staticmethod
+	def _get_key(el):
+		"""
+		Cache key of a single filter specification. The type of the value is part of the key
+		since True == 1 == 1.0 (same hash). Specifications using the operators 'is'/'is not'
+		are only cached for singleton values (None, True, False).
+		:raises TypeError: if the specification should not be cached
+		"""
+		value = el['value']
+		if el['operator'] in ('is', 'is not') and type(value) not in (bool, type(None)):
+			raise TypeError("Identity-dependent filter")
+		return el['attribute'], el['operator'], type(value), value
+
+
+	def __init__(self, filters, photo_data=False, keywords=None):
+		"""
+		Use for_mappings() or for_photo_data() rather than this constructor
+		to benefit from caching.
+		"""
+		self.keywords = keywords
+		self.conditions = tuple(
+			(
+				keywords.get(el['attribute'], el['attribute']) if keywords else el['attribute'],
+				CompiledFilter.ops[el['operator']],
+				int(el['value']) if isinstance(el['value'], IntFlag) else el['value']
+			)
+			for el in filters
+		)
+
+		self.predicate = (
+			CompiledFilter._photo_data_predicate(self.conditions) if photo_data
+			else CompiledFilter._mapping_predicate(self.conditions)
+		)
+
+
+	def __call__(self, match_objs):
+		"""
+		:returns: tuple of elements matching all conditions
+		"""
+		return tuple(filter(self.predicate, match_objs))
+
+
+	def mask(self, columns):
+		"""
+		:param columns: object providing the method get_mask(attribute, operator, value),
+		for example an instance of :py:class:`ampel.base.PhotoColumns.PhotoColumns`
+		:returns: numpy bool array flagging the rows matching all conditions
+		"""
+		mask = np.ones(len(columns), dtype=bool)
+		for attr, op, value in self.conditions:
+			mask &= columns.get_mask(attr, op, value)
+		return mask
+
+
+	@staticmethod
+	def _mapping_predicate(conditions):
+		""" Returns a single function evaluating all conditions on a dict-like element """
+
+		if len(conditions) == 1:
+			(a, op, v), = conditions
+			return lambda el: a in el and op(el[a], v)
+
+		if len(conditions) == 2:
+			(a1, op1, v1), (a2, op2, v2) = conditions
+			return lambda el: a1 in el and a2 in el and op1(el[a1], v1) and op2(el[a2], v2)
+
+		def predicate(el):
+			for a, op, v in conditions:
+				if a not in el or not op(el[a], v):
+					return False
+			return True
+
+		return predicate
+
+
+	@staticmethod
+	def _photo_data_predicate(conditions):
+		""" Returns a single function evaluating all conditions on a PhotoData element """
+
+		tests = tuple(
+			(lambda x, op=op, v=v: x.flags is not None and op(int(x.flags), v))
+			if a == CompiledFilter.flags_attribute else
+			(lambda x, a=a, op=op, v=v: x.has_parameter(a) and op(x.get_value(a), v))
+			for a, op, v in conditions
+		)
+
+		if len(tests) == 1:
+			return tests[0]
+
+		def predicate(x):
+			for test in tests:
+				if not test(x):
+					return False
+			return True
+
+		return predicate
@@ -4,16 +4,70 @@
 # License           : BSD-3-Clause
 # Author            : vb <vbrinnel@physik.hu-berlin.de>
 # Date              : 01.03.2018
-# Last Modified Date: 07.06.2018
+# Last Modified Date: 18.10.2026
 # Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
 
 class Frozen:
+	"""
+	Base class of immutable instances based on __slots__ (no per-instance __dict__).
+	Subclasses declare their instance attributes in __slots__ (an empty tuple if none,
+	otherwise instances get a __dict__ again) and call self._freeze() at the end
+	of the constructor. Setting an attribute of a frozen instance raises a TypeError.
+	The previous idiom (setting self.__isfrozen = True, i.e. self._<Class>__isfrozen,
+	at the end of the constructor) is still honored, with two behavior changes:
+	instances of subclasses of such a class are now frozen as well (previously,
+	name mangling left them mutable, as only _<instance class>__isfrozen was checked)
+	and the value is interpreted as a bool (previously, any value but None, False included,
+	froze the instance). Subclasses setting attributes after the constructor of their
+	parent class has run must thus do so before freezing (or use object.__setattr__).
+	Pickling is supported through __getstate__/__setstate__.
+	"""
+
+	__slots__ = ('_isfrozen', )
+
+
+	def __new__(cls, *args, **kwargs):
+		self = object.__new__(cls)
+		object.__setattr__(self, '_isfrozen', False)
+		return self
+
 
 	def __setattr__(self, key, value):
 		"""
 		Overrride python's default __setattr__ method to enable frozen instances
 		"""
-		# '_%s__isfrozen' and not simply '__isfrozen' because: 'Private name mangling'
-		if getattr(self, "_%s__isfrozen" % self.__class__.__name__, None) is not None:
-			raise TypeError( "%r is a frozen instance " % self )
+		if self._isfrozen:
+			raise TypeError("%r is a frozen instance " % self)
+		if key.endswith('__isfrozen'):
+			# Legacy idiom: self.__isfrozen = True (name-mangled as _<Class>__isfrozen)
+			key, value = '_isfrozen', bool(value)
 		object.__setattr__(self, key, value)
+
+
+	def __delattr__(self, key):
+		if self._isfrozen:
+			raise TypeError("%r is a frozen instance " % self)
+		object.__delattr__(self, key)
+
+
+	def _freeze(self):
+		""" Makes this instance immutable """
+		object.__setattr__(self, '_isfrozen', True)
+
+
+	def __getstate__(self):
+		"""
+		:returns: dict containing the (set) slot values of this instance
+		"""
+		state = {}
+		for klass in type(self).__mro__:
+			for k in klass.__dict__.get('__slots__', ()):
+				if k not in state and hasattr(self, k):
+					state[k] = getattr(self, k)
+		return state
+
+
+	def __setstate__(self, state):
+		""" """
+		for k, v in state.items():
+			object.__setattr__(self, k, v)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/KeywordAccessor.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+from operator import itemgetter
+
+
+class KeywordAccessor:
+	"""
+	Ampel keywords (such as 'mag') resolved once into the keys of the underlying
+	photopoint dicts (for ZTF-IPAC: 'magpsf') and compiled into an itemgetter.
+	Instances are cached per (keyword mapping, parameter tuple).
+	The cache is cleared by AmpelAlert.set_alert_keywords() and PhotoData.set_keywords().
+	"""
+
+	__slots__ = ('keywords', 'keys', 'key_set', 'get')
+
+	#: Maximum number of cached accessors
+	max_size = 4096
+
+	_cache = {}
+
+
+	@classmethod
+	def get_accessor(cls, keywords, params):
+		"""
+		:param keywords: dict mapping ampel keywords to photopoint keys.
+		The dict instance is referenced by the accessor and should not be modified in place.
+		:param params: tuple of ampel keywords or photopoint keys
+		:returns: KeywordAccessor instance
+		"""
+		key = (id(keywords), params)
+		acc = cls._cache.get(key)
+		if acc is None:
+			if len(cls._cache) >= cls.max_size:
+				cls._cache.clear()
+			acc = cls(keywords, params)
+			# The keywords dict is referenced by acc, its id can thus not be recycled
+			cls._cache[key] = acc
+		return acc
+
+
+	@classmethod
+	def clear_cache(cls):
+		""" """
+		cls._cache.clear()
+
+
+	def __init__(self, keywords, params):
+		""" """
+		self.keywords = keywords
+		self.keys = tuple(keywords.get(p, p) for p in params)
+		self.key_set = frozenset(self.keys)
+		if len(self.keys) > 1:
+			self.get = itemgetter(*self.keys)
+		elif self.keys:
+			self.get = lambda d, k=self.keys[0]: (d[k], )
+		else:
+			self.get = lambda d: ()
+
+
+	def select(self, dicts):
+		"""
+		:param dicts: iterable of dict-like objects
+		:returns: tuple of value tuples, for the dicts containing all keys
+		"""
+		key_set = self.key_set
+		get = self.get
+		return tuple(get(d) for d in dicts if d.keys() >= key_set)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/LazyTransientView.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import time
+from ampel.base.TransientView import TransientView
+
+
+class LazyTransientView(TransientView):
+	"""
+	TransientView whose components (see attribute 'components') can be backed
+	by loader callables rather than being provided to the constructor.
+	A component is loaded on first access (loader(tran_id)), frozen (lists are 
+	casted into tuples) and memoized: subsequent accesses are plain attribute reads.
+
+	Access statistics (number of views, number of loads and loading time per component)
+	are collected class-wide (see get_stats()), so that T3 jobs can tune which 
+	components should rather be preloaded in bulk.
+
+	Example:
+
+	.. sourcecode:: python
+
+		tv = LazyTransientView(
+			tran_id, flags, {'t2records': load_t2records, 'journal': load_journal},
+			latest_state=latest_state
+		)
+		tv.get_science_records(latest=True)   # only t2records are loaded
+
+	See :py:class:`ampel.base.dev.InMemoryTransientStore.InMemoryTransientStore` for tests.
+	"""
+
+	__slots__ = ('_loaders', )
+
+	#: Components which can be loaded lazily
+	components = ('journal', 'photopoints', 'upperlimits', 'compounds', 'lightcurves', 't2records')
+
+	#: Serialized (see ampel.utils.json_serialization) as a materialized TransientView:
+	#: serialize() loads the remaining components, loaders are not serialized
+	serialize_as = TransientView
+
+	_stats = {'views': 0, 'loads': {}, 'load_time': {}}
+
+
+	@classmethod
+	def get_stats(cls):
+		"""
+		:returns: dict with keys 'views' (number of instances created), 'loads' (number of loads
+		per component), 'load_time' (cumulated loading time per component in seconds) 
+		and 'load_ratio' (fraction of the instances which loaded a given component)
+		"""
+		stats = cls._stats
+		return {
+			'views': stats['views'],
+			'loads': dict(stats['loads']),
+			'load_time': dict(stats['load_time']),
+			'load_ratio': {
+				k: v / stats['views'] for k, v in stats['loads'].items()
+			} if stats['views'] else {}
+		}
+
+
+	@classmethod
+	def reset_stats(cls):
+		""" """
+		cls._stats['views'] = 0
+		cls._stats['loads'].clear()
+		cls._stats['load_time'].clear()
+
+
+	def __init__(self, 
+		tran_id, flags, loaders, tran_names=None, latest_state=None, channel=None, **components
+	):
+		"""
+		:param loaders: dict: component name -> callable accepting the transient id as 
+		argument and returning the component value (see TransientView constructor)
+		:param components: components provided directly (take precedence over loaders).
+		Components neither loadable nor provided are set to None.
+		"""
+		unknown = (set(loaders) | set(components)) - set(LazyTransientView.components)
+		if unknown:
+			raise ValueError("Unknown component(s): %s" % ", ".join(sorted(unknown)))
+
+		self.tran_id = tran_id
+		self.tran_names = tran_names
+		self.flags = flags
+		self.latest_state = latest_state
+		self.channel = channel
+
+		for name in LazyTransientView.components:
+			if name in components:
+				setattr(self, name, components[name])
+			elif name not in loaders:
+				setattr(self, name, None)
+
+		self._loaders = {k: v for k, v in loaders.items() if k not in components}
+
+		# Lazily computed indexes (see TransientView._get_index)
+		self._cache = {}
+		LazyTransientView._stats['views'] += 1
+		self._freeze()
+
+
+	def __getattr__(self, name):
+		"""
+		Called only for unset attributes, that is for components not loaded yet
+		"""
+		try:
+			loader = object.__getattribute__(self, '_loaders').get(name)
+		except AttributeError:
+			loader = None
+
+		if loader is None:
+			raise AttributeError(
+				"'%s' object has no attribute '%s'" % (self.__class__.__name__, name)
+			)
+
+		start = time.perf_counter()
+		value = loader(self.tran_id)
+		if type(value) is list:
+			value = tuple(value)
+
+		stats = LazyTransientView._stats
+		stats['loads'][name] = stats['loads'].get(name, 0) + 1
+		stats['load_time'][name] = stats['load_time'].get(name, 0) + time.perf_counter() - start
+
+		object.__setattr__(self, name, value)
+		return value
+
+
+	def is_loaded(self, name):
+		"""
+		:returns: True if the provided component was provided, loaded or is not loadable
+		"""
+		try:
+			object.__getattribute__(self, name)
+			return True
+		except AttributeError:
+			return False
+
+
+	def preload(self, *names):
+		"""
+		Loads the provided components (default: all loadable components)
+		"""
+		for name in names or self._loaders:
+			getattr(self, name)
+
+
+	def __getstate__(self):
+		""" Pickled instances contain every component (loaders are not pickled) """
+		self.preload()
+		state = TransientView.__getstate__(self)
+		state['_loaders'] = {}
+		return state
@@ -4,11 +4,20 @@
 # License           : BSD-3-Clause
 # Author            : vb <vbrinnel@physik.hu-berlin.de>
 # Date              : 13.01.2018
-# Last Modified Date: 24.06.2018
+# Last Modified Date: 18.10.2026
 # Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
 
-import operator
+import numpy as np
+from itertools import compress
 from ampel.base.Frozen import Frozen
+from ampel.base.PhotoColumns import to_column, column_mask, concat_columns, flag_mask, is_scalar
+from ampel.base.ChunkedSequence import ChunkedSequence
+from ampel.base.PooledSequence import PooledSequence
+from ampel.base.PhotoData import PhotoData
+from ampel.base.TimeIndex import TimeIndex
+from ampel.base.BandIndex import BandIndex
+from ampel.base.CompiledFilter import CompiledFilter
+from ampel.utils.tabular import columns_to_arrow, columns_to_pandas
 
 class LightCurve(Frozen):
 	"""
@@ -18,18 +27,21 @@ class LightCurve(Frozen):
 	If time allows, a possible object oriented parent/child structure could be tested, 
 	whereby it is important to keep in mind that AmpelAlert efficiency is an important 
 	criteria since *every* ZTF alert yields an AmpelAlert obj).
+
+	Read-only instances memoize columnar representations of the requested fields 
+	(see to_arrays()), which are then used to serve get_values(), get_tuples(), 
+	get_ntuples() and filters.
 	"""
 	
-	_ops = {
-		'>': operator.gt,
-		'<': operator.lt,
-		'>=': operator.ge,
-		'<=': operator.le,
-		'==': operator.eq,
-		'!=': operator.ne,
-		'is': operator.is_,
-		'is not': operator.is_not
-	}
+	_ops = CompiledFilter.ops
+
+	# Immutable sequence types referenced without copy by read-only instances
+	_shared_types = (ChunkedSequence, PooledSequence)
+
+	# Python type of the values of numeric columns per numpy dtype kind (see _build_column)
+	_py_types = {'b': bool, 'i': int, 'f': float}
+
+	__slots__ = ('id', 'info', 'ppo_list', 'ulo_list', '_cache')
 
 	
 	def __init__(self, compound_id, ppo_list, ulo_list=None, info=None, read_only=True, logger=None):
@@ -51,10 +63,21 @@ class LightCurve(Frozen):
 		self.id = compound_id
 		self.info = info
 
+		# Lazily computed structures (indexes, ...) can only be cached by frozen instances
+		self._cache = {} if read_only else None
+
 		if read_only:
-			self.ppo_list = tuple(el for el in ppo_list)
-			self.ulo_list = tuple(el for el in ulo_list) if ulo_list is not None else []
-			self.__isfrozen = True
+			# ChunkedSequence (see extend()) and PooledSequence (see PhotoPool) 
+			# instances are immutable and shared as is
+			self.ppo_list = (
+				ppo_list if type(ppo_list) in LightCurve._shared_types 
+				else tuple(el for el in ppo_list)
+			)
+			self.ulo_list = (
+				ulo_list if type(ulo_list) in LightCurve._shared_types 
+				else tuple(el for el in ulo_list) if ulo_list is not None else []
+			)
+			self._freeze()
 		else:
 			self.ppo_list = ppo_list
 			self.ulo_list = ulo_list if ulo_list is not None else []
@@ -66,10 +89,73 @@ class LightCurve(Frozen):
 				(len(self.ppo_list), len(self.ulo_list))
 			)
 
+
+	def extend(self, new_compound_id, added_ppos, added_ulos=None, info=None, logger=None):
+		"""
+		Returns a new read-only LightCurve containing the photopoints and upper limits
+		of this instance plus the provided ones (usually: the points added by a new alert).
+		The point collections of this instance are shared (see ChunkedSequence), 
+		as are its memoized columns and indexes, which are extended rather than rebuilt.
+		Memory usage and build time thus scale with the size of the update.
+
+		new_compound_id: instance of bson.Binary (subtype: 5)
+		added_ppos: list of ampel.base.core.PhotoPoint instances
+		added_ulos: list of ampel.base.core.UpperLimit instances
+		info: dict instance with additional info ('added', 'tier', ...)
+		"""
+		added = (tuple(added_ppos), tuple(added_ulos) if added_ulos else ())
+
+		if self._cache is None:
+			return LightCurve(
+				new_compound_id, list(self.ppo_list) + list(added[0]), 
+				list(self.ulo_list) + list(added[1]), info, False, logger
+			)
+
+		lc = LightCurve(
+			new_compound_id, 
+			*(
+				(old if type(old) is ChunkedSequence else ChunkedSequence((tuple(old), )))
+				.extended(new) if new else old
+				for old, new in ((self.ppo_list, added[0]), (self.ulo_list, added[1]))
+			),
+			info=info, logger=logger
+		)
+
+		for key, value in self._cache.items():
+
+			upper_limits = key[-1]
+			new = added[1] if upper_limits else added[0]
+			if not new:
+				lc._cache[key] = value
+				continue
+
+			old_len = len(self.ulo_list if upper_limits else self.ppo_list)
+
+			if key[0] == 'column':
+				new_col = LightCurve._build_column(new, key[1])
+				lc._cache[key] = concat_columns((value[:2], new_col[:2])) + (value[2] and new_col[2], )
+
+			elif key[0] == 'time_index':
+				times, objs = LightCurve._get_dated(new)
+				lc._cache[key] = value.extended(
+					times, objs, range(len(value), len(value) + len(objs))
+				)
+
+			elif key[0] == 'band_index':
+				lc._cache[key] = value.extended(LightCurve._get_fids(new), new, old_len)
+
+			# Other structures (per-band columns) are derived lazily from the above
+
+		return lc
+
+
 	def serialize(self):
 		fields = ["id", "ppo_list", "ulo_list", "info"]
 		rep = {k: getattr(self, k) for k in fields}
 		rep['compound_id'] = rep.pop('id')
+		for k in ("ppo_list", "ulo_list"):
+			if type(rep[k]) in LightCurve._shared_types:
+				rep[k] = tuple(rep[k])
 		return rep
 
 	def get_values(self, field_name, filters=None, upper_limits=False):
@@ -78,11 +164,20 @@ class LightCurve(Frozen):
 		'filters' example: {'attribute': 'magpsf', 'operator': '<', 'value': 18}
 		'upper_limits': if set to True, upper limits are returned instead of photopoints
 		"""
-		return [
-			obj.get_value(field_name) 
-			for obj in self._get_photo_objs(filters, upper_limits) 
-			if obj.has_parameter(field_name)
-		]
+		cols = self._get_cached_columns((field_name, ), filters, upper_limits)
+		if cols is not None:
+			return cols[0]
+
+		ret = []
+		kws = None
+		for obj in self._get_photo_objs(filters, upper_limits):
+			# keyword resolution is only performed when the keyword mapping changes
+			if obj.keywords is not kws:
+				kws = obj.keywords
+				key = kws.get(field_name, field_name)
+			if key in obj.content:
+				ret.append(obj.content[key])
+		return ret
 
 
 	def get_tuples(self, field1_name, field2_name, filters=None, upper_limits=False):
@@ -91,11 +186,15 @@ class LightCurve(Frozen):
 		'filters' example: {'attribute': 'magpsf', 'operator': '<', 'value': 18}
 		'upper_limits': if set to True, upper limits are returned instead of photopoints
 		"""
-		return [
-			(obj.get_value(field1_name), obj.get_value(field2_name))
-			for obj in self._get_photo_objs(filters, upper_limits) 
-			if obj.has_parameter(field1_name) and obj.has_parameter(field2_name)
-		]
+		cols = self._get_cached_columns((field1_name, field2_name), filters, upper_limits)
+		if cols is not None:
+			return list(zip(*cols))
+
+		return list(
+			LightCurve._select(
+				self._get_photo_objs(filters, upper_limits), (field1_name, field2_name)
+			)
+		)
 
 
 	def get_ntuples(self, params, filters=None, upper_limits=False):
@@ -105,42 +204,203 @@ class LightCurve(Frozen):
 		'filters' example: {'attribute': 'magpsf', 'operator': '<', 'value': 18}
 		'upper_limits': if set to True, upper limits are returned instead of photopoints
 		"""
+		cols = self._get_cached_columns(params, filters, upper_limits)
+		if cols is not None:
+			return tuple(zip(*cols))
+
 		return tuple(
-			tuple(obj.get_value(param) for param in params) 
-			for obj in self._get_photo_objs(filters, upper_limits) 
-			if all(obj.has_parameter(param) for param in params)
+			LightCurve._select(
+				self._get_photo_objs(filters, upper_limits), tuple(params)
+			)
 		)
 
+
+	def to_arrays(self, fields, upper_limits=False):
+		"""
+		Columnar representation of the provided fields.
+		ex: (mjds, mags), mask = instance.to_arrays(['obs_date', 'mag'])
+
+		:param fields: list/tuple of field names
+		:param upper_limits: if True, upper limits are used instead of photopoints
+		:returns: tuple (tuple of read-only numpy arrays with one entry per point, 
+		numpy bool array flagging the points defining all fields).
+		Undefined entries of numeric arrays are set to 0 or NaN (see PhotoColumns.to_column).
+		Arrays are memoized if this instance is read-only.
+		"""
+		cols = [self._get_column(field, upper_limits) for field in fields]
+		if len(cols) == 1:
+			return (cols[0][0], ), cols[0][1]
+		return tuple(col[0] for col in cols), np.logical_and.reduce([col[1] for col in cols])
+
+
+	def get_columns(self, fields=None, upper_limits=False):
+		"""
+		:param fields: list/tuple of field names (default: all fields of the points)
+		:param upper_limits: if True, upper limits are used instead of photopoints
+		:returns: dict: field name -> tuple (read-only numpy array, numpy bool mask), see to_arrays()
+		"""
+		if fields is None:
+			fields = dict.fromkeys(
+				k for obj in (self.ulo_list if upper_limits else self.ppo_list) for k in obj.content
+			)
+		return {field: self._get_column(field, upper_limits)[:2] for field in fields}
+
+
+	def to_arrow(self, fields=None, upper_limits=False):
+		"""
+		:returns: pyarrow.Table referencing the (memoized) columns of the provided fields,
+		see get_columns(). Requires the optional dependency pyarrow.
+		"""
+		return columns_to_arrow(self.get_columns(fields, upper_limits))
+
+
+	def to_pandas(self, fields=None, upper_limits=False):
+		"""
+		:returns: pandas.DataFrame referencing the (memoized) columns of the provided fields,
+		see get_columns(). Requires the optional dependency pandas.
+		"""
+		return columns_to_pandas(self.get_columns(fields, upper_limits))
+
+
+	def _get_column(self, field, upper_limits):
+		"""
+		:returns: tuple (numpy array, numpy bool mask, exact) where 'exact' is False 
+		if some points contain the field with value None (considered as undefined 
+		by the columnar representation) or if the column does not restore the 
+		original values (ex: numpy scalar values), in which case the column 
+		cannot be used to serve the legacy accessors
+		"""
+		return self._get_cached(
+			('column', field, upper_limits), 
+			lambda: LightCurve._build_column(self.ulo_list if upper_limits else self.ppo_list, field)
+		)
+
+
+	@staticmethod
+	def _build_column(photo_objs, field):
+		""" see _get_column() """
+		if field == CompiledFilter.flags_attribute:
+			return to_column(
+				[int(obj.flags) if obj.flags is not None else None for obj in photo_objs]
+			) + (True, )
+
+		values = []
+		exact = True
+		kws = None
+		for obj in photo_objs:
+			if obj.keywords is not kws:
+				kws = obj.keywords
+				key = kws.get(field, field)
+			v = obj.content.get(key)
+			if v is None and key in obj.content:
+				exact = False
+			values.append(v)
+
+		arr, mask = to_column(values)
+		if exact and arr.dtype != object:
+			# Legacy accessors return python values (tolist()), which must have the
+			# type of the original values (not the case for numpy scalar values)
+			exact = {type(v) for v in values if v is not None} <= {LightCurve._py_types[arr.dtype.kind]}
+		return arr, mask, exact
+
+
+	def _get_filter_mask(self, filters, upper_limits):
+		"""
+		:returns: numpy bool array flagging the points matching the provided filter(s)
+		or None if the filters cannot be evaluated on memoized columns
+		(instance not read-only, non-scalar filter values, ambiguous None values)
+		"""
+		if self._cache is None:
+			return None
+
+		conditions = CompiledFilter.for_photo_data(filters).conditions
+		# Non-scalar values (ex: tuples) would be broadcasted by numpy against the columns
+		if not all(is_scalar(value) for attr, op, value in conditions):
+			return None
+
+		mask = None
+		for attr, op, value in conditions:
+			arr, defined, exact = self._get_column(attr, upper_limits)
+			if not exact:
+				return None
+			m = column_mask(arr, defined, op, value)
+			mask = m if mask is None else mask & m
+
+		return mask
+
+
+	def _get_cached_columns(self, fields, filters, upper_limits):
+		"""
+		:returns: list of lists of values (one list per field) for the points 
+		defining all fields and matching the filters, or None if memoized 
+		columns cannot be used (instance not read-only, ambiguous None values)
+		"""
+		if self._cache is None:
+			return None
+
+		cols = [self._get_column(field, upper_limits) for field in fields]
+		if not all(col[2] for col in cols):
+			return None
+
+		mask = cols[0][1]
+		for col in cols[1:]:
+			mask = mask & col[1]
+
+		if filters is not None:
+			fmask = self._get_filter_mask(filters, upper_limits)
+			if fmask is None:
+				return None
+			mask = mask & fmask
+
+		return [col[0][mask].tolist() for col in cols]
+
+
+	@staticmethod
+	def _select(photo_objs, params):
+		"""
+		:returns: generator of value tuples for the objects containing all params
+		"""
+		kws = None
+		for obj in photo_objs:
+			if obj.keywords is not kws:
+				kws = obj.keywords
+				acc = PhotoData.get_accessor(kws, params)
+				key_set = acc.key_set
+				get = acc.get
+			content = obj.content
+			if content.keys() >= key_set:
+				yield get(content)
+
 	
 	def get_photopoints(self, filters=None):
 		""" returns a list of dicts """
-		return (
-			self._apply_filter(self.ppo_list, filters) if filters is not None 
-			else self.ppo_list
-		)
+		return self._get_photo_objs(filters, False)
 
 
 	def get_upperlimits(self, filters=None):
 		""" returns a list of dicts """
-		return (
-			self._apply_filter(self.ulo_list, filters) if filters is not None 
-			else self.ulo_list
-		)
+		return self._get_photo_objs(filters, True)
 
 
 	# TODO: improve
-	def get_pos(self, ret="brightest", filters=None):
+	def get_pos(self, ret="brightest", filters=None, n_sigma=3., max_iter=5):
 		"""
 		ret (for all methods, only matching PhotoPoint wrt the provided filter(s) are used!):
 		"raw": returns ((ra, dec), (ra, dec), ...)
 		"mean": returns (<ra>, <dec>)
-		"brightest": returns (ra, dec)
+		"weighted_mean": returns (<ra>, <dec>) weighted by 1/sigmapsf**2 (inverse variance)
+		"clipped_mean": returns (<ra>, <dec>) after iterative n_sigma clipping 
+		(at most max_iter iterations) of outlying positions
+		"brightest": returns (ra, dec) of the PhotoPoint with the lowest magpsf
 		"latest": returns (ra, dec)
 
+		Means are computed modulo 360 deg in ra (transients close to ra = 0).
+		Positions are selected using numpy arrays (see to_arrays()) without sorting.
+
 		examples::
 			
 			instance.get_pos(
-				"brightest", {'attribute': 'alFlags', 'operator': 'in', 'value': PhotoFlags.ZTF_G}
+				"brightest", {'attribute': 'alFlags', 'operator': 'in', 'value': PhotoFlags.BAND_ZTF_G}
 			)
 		
 		returns the position of the brightest PhotoPoint in the ZTF G band
@@ -150,66 +410,285 @@ class LightCurve(Frozen):
 			instance.get_pos("lastest", {'attribute': 'magpsf', 'operator': '<', 'value': 18})
 		
 		returns the position of the latest PhotoPoint in time with a magnitude brighter than 18
-		(or an empty array if no PhotoPoint matches this criteria)
+		(or None if no PhotoPoint matches this criteria)
 		"""
 
 		if ret == "raw": 
 			return self.get_tuples("ra", "dec", filters=filters)
 
-		pps = self._apply_filter(self.ppo_list, filters) if filters is not None else self.ppo_list
-
-		if ret == "mean": 
-			ras = [pp.get_value("ra") for pp in pps]
-			decs = [pp.get_value("dec") for pp in pps]
-			return (sum(ras)/len(ras), sum(decs)/len(decs))
+		(ra, dec), mask = self.to_arrays(("ra", "dec"))
+		if filters is not None:
+			mask = mask & self._get_point_mask(filters, False)
 
-		elif ret == "brightest": 
-			mags = list(pps)
-			mags.sort(key=lambda x: x.get_value('magpsf'))
-			return (mags[-1].get_value('ra'), mags[-1].get_value('dec'))
+		if ret == "brightest": 
+			(key, ), kmask = self.to_arrays(("magpsf", ))
+			idx = LightCurve._arg_select(key, mask & kmask, np.argmin)
 
 		elif ret == "latest": 
-			mags = list(pps)
-			mags.sort(key=lambda x: x.get_value('obs_date'))
-			return (mags[-1].get_value('ra'), mags[-1].get_value('dec'))
+			(key, ), kmask = self.to_arrays(("obs_date", ))
+			idx = LightCurve._arg_select(key, mask & kmask, np.argmax)
+
+		elif ret in ("mean", "weighted_mean", "clipped_mean"):
+
+			if ret == "weighted_mean":
+				(err, ), emask = self.to_arrays(("sigmapsf", ))
+				mask = mask & emask
+
+			if not mask.any():
+				return None
+
+			ra, dec = ra[mask].astype(float), dec[mask].astype(float)
+
+			if ret == "weighted_mean":
+				return LightCurve._mean_pos(ra, dec, 1. / err[mask].astype(float) ** 2)
+
+			if ret == "clipped_mean":
+				keep = np.ones(len(ra), dtype=bool)
+				for i in range(max_iter):
+					new_keep = keep.copy()
+					for coord in (LightCurve._unwrap_ra(ra), dec):
+						med = np.median(coord[keep])
+						std = np.std(coord[keep])
+						new_keep &= np.abs(coord - med) <= n_sigma * std
+					if not new_keep.any() or (new_keep == keep).all():
+						break
+					keep = new_keep
+				ra, dec = ra[keep], dec[keep]
+
+			return LightCurve._mean_pos(ra, dec)
 
 		else:
 			raise NotImplementedError("ret method: %s is not implemented" % ret)
 
+		if idx is None:
+			return None
 
-	def _get_photo_objs(self, filters, upper_limits):
-		"""	
-		"""	
-		if filters is None:
-			return self.ulo_list if upper_limits else self.ppo_list
-		else:
-			return (
-				self._apply_filter(self.ulo_list, filters) if upper_limits 
-				else self._apply_filter(self.ppo_list, filters)
+		# item() also works on arrays of dtype object (values of different kinds)
+		return (ra.item(idx), dec.item(idx))
+
+
+	@staticmethod
+	def _arg_select(values, mask, argfunc):
+		"""
+		:returns: index of the min/max (depending on argfunc) of values 
+		among the entries flagged by mask, or None if mask is empty
+		"""
+		sel = np.flatnonzero(mask)
+		if len(sel) == 0:
+			return None
+		return sel[argfunc(values[sel])]
+
+
+	@staticmethod
+	def _unwrap_ra(ra):
+		""" Returns ra values shifted into [ra[0] - 180, ra[0] + 180[ """
+		return ra[0] + (ra - ra[0] + 180.) % 360. - 180.
+
+
+	@staticmethod
+	def _mean_pos(ra, dec, weights=None):
+		""" :returns: tuple (ra, dec) """
+		return (
+			float(np.average(LightCurve._unwrap_ra(ra), weights=weights) % 360.),
+			float(np.average(dec, weights=weights))
+		)
+
+
+	def _get_point_mask(self, filters, upper_limits):
+		"""
+		:returns: numpy bool array flagging the points matching the provided filter(s).
+		Memoized columns are used if possible (scalar filter values, see _get_filter_mask()),
+		CompiledFilter.predicate otherwise
+		"""
+		mask = self._get_filter_mask(filters, upper_limits)
+		if mask is not None:
+			return mask
+
+		photo_objs = self.ulo_list if upper_limits else self.ppo_list
+		return np.fromiter(
+			map(CompiledFilter.for_photo_data(filters).predicate, photo_objs),
+			dtype=bool, count=len(photo_objs)
+		)
+
+
+	def get_flags(self, upper_limits=False):
+		"""
+		:returns: tuple (read-only numpy int64 array containing the flags of each point
+		as integer, numpy bool array flagging the points with flags).
+		Arrays are memoized if this instance is read-only. 
+		Filters can reference these flags using the attribute name 'alFlags'
+		and the operator 'in' (ex: {'attribute': 'alFlags', 'operator': 'in', 'value': PhotoFlags.BAND_ZTF_G})
+		"""
+		return self._get_column(CompiledFilter.flags_attribute, upper_limits)[:2]
+
+
+	def get_flag_mask(self, any_of=None, all_of=None, none_of=None, upper_limits=False):
+		"""
+		:param any_of: flag or list of flags, at least one of which must be set
+		:param all_of: flag or list of flags which must all be set
+		:param none_of: flag or list of flags which must not be set
+		:returns: numpy bool array flagging the points matching all provided criteria
+		(each criterion is evaluated using a single bitwise operation on get_flags())
+		"""
+		return flag_mask(*self.get_flags(upper_limits), any_of, all_of, none_of)
+
+
+	def get_flagged(self, any_of=None, all_of=None, none_of=None, upper_limits=False):
+		"""
+		ex: instance.get_flagged(all_of=PhotoFlags.BAND_ZTF_R, none_of=PhotoFlags.SUPERSEDED)
+		:returns: tuple of photopoints (or upper limits) matching all provided criteria, see get_flag_mask()
+		"""
+		return tuple(
+			compress(
+				self.ulo_list if upper_limits else self.ppo_list, 
+				self.get_flag_mask(any_of, all_of, none_of, upper_limits)
 			)
+		)
 
 
-	def _apply_filter(self, match_objs, filters):
+	def get_window(self, start=None, end=None, upper_limits=False):
 		"""
+		Returns a tuple of photopoints (or upper limits if upper_limits is True) 
+		with start <= obs_date <= end, sorted by obs_date.
+		start/end: None means unbounded.
+		Runs in O(log n + k) using a time index built on first use
+		(and cached if this instance is read-only).
 		"""
-		if type(filters) is dict:
-			filters = [filters]
-		else:
-			if filters is None or type(filters) is not list:
-				raise ValueError("filters must be of type dict or list")
+		ti = self._get_time_index(upper_limits)
+		return ti.get_items(ti.get_slice(start, end))
 
-		for filter_el in filters:
 
-			operator = LightCurve._ops[
-				filter_el['operator']
-			]
+	def get_before(self, obs_date, upper_limits=False, inclusive=False):
+		"""
+		Returns a tuple of photopoints (or upper limits) observed before obs_date, sorted by obs_date.
+		ex: upper limits before first detection:
+		instance.get_before(instance.get_window()[0].get_value('obs_date'), upper_limits=True)
+		"""
+		ti = self._get_time_index(upper_limits)
+		return ti.get_items(ti.get_before_slice(obs_date, inclusive))
 
-			attr_name = filter_el['attribute']
-			match_objs = tuple(
-				filter(
-					lambda x: x.has_parameter(attr_name) and operator(x.get_value(attr_name), filter_el['value']), 
-					match_objs
-				)
+
+	def get_after(self, obs_date, upper_limits=False, inclusive=False):
+		"""
+		Returns a tuple of photopoints (or upper limits) observed after obs_date, sorted by obs_date.
+		ex: detections within the last 3 days: instance.get_after(now_jd - 3)
+		"""
+		ti = self._get_time_index(upper_limits)
+		return ti.get_items(ti.get_after_slice(obs_date, inclusive))
+
+
+	def _get_time_index(self, upper_limits):
+		""" 
+		:returns: TimeIndex instance referencing the objects defining 'obs_date'
+		"""
+		return self._get_cached(
+			('time_index', upper_limits), 
+			lambda: TimeIndex(*LightCurve._get_dated(self.ulo_list if upper_limits else self.ppo_list))
+		)
+
+
+	@staticmethod
+	def _get_dated(photo_objs):
+		""" :returns: tuple (obs dates, objects defining 'obs_date') """
+		objs = [obj for obj in photo_objs if obj.has_parameter('obs_date')]
+		return [obj.get_value('obs_date') for obj in objs], objs
+
+
+	def get_band(self, band, upper_limits=False):
+		"""
+		Returns a tuple of photopoints (or upper limits if upper_limits is True) 
+		observed in the provided band, in original order.
+		:param band: filter id (ZTF: 1, 2 or 3) or band flag (ex: PhotoFlags.BAND_ZTF_G)
+		The band of each point is determined once, using its band flag if available
+		or otherwise its 'filter_id' value (default key: 'fid').
+		"""
+		return self._get_band_index(upper_limits).get_items(band)
+
+
+	def get_bands(self, upper_limits=False):
+		""" Returns the sorted tuple of the filter ids of the points """
+		return self._get_band_index(upper_limits).get_bands()
+
+
+	def get_band_arrays(self, band, fields, upper_limits=False):
+		"""
+		Columnar representation of the provided fields for the points of the provided band.
+		ex: (mjds, mags), mask = instance.get_band_arrays(PhotoFlags.BAND_ZTF_R, ['obs_date', 'mag'])
+		:returns: see to_arrays()
+		"""
+		fid = BandIndex.get_fid(band)
+		pos = self._get_band_index(upper_limits).get_positions(fid)
+
+		def build(field):
+			arr, mask, exact = self._get_column(field, upper_limits)
+			arr, mask = arr[pos], mask[pos]
+			arr.flags.writeable = False
+			mask.flags.writeable = False
+			return arr, mask
+
+		cols = [
+			self._get_cached(('band_column', fid, field, upper_limits), lambda: build(field))
+			for field in fields
+		]
+		if len(cols) == 1:
+			return (cols[0][0], ), cols[0][1]
+		return tuple(col[0] for col in cols), np.logical_and.reduce([col[1] for col in cols])
+
+
+	def _get_band_index(self, upper_limits):
+		""" 
+		:returns: BandIndex instance referencing the objects with known band
+		"""
+		def build():
+			objs = self.ulo_list if upper_limits else self.ppo_list
+			return BandIndex(LightCurve._get_fids(objs), objs)
+
+		return self._get_cached(('band_index', upper_limits), build)
+
+
+	@staticmethod
+	def _get_fids(photo_objs):
+		""" :returns: list of filter ids (None if unknown) """
+		fids = []
+		for obj in photo_objs:
+			fid = BandIndex.get_flag_fid(obj.flags)
+			fids.append(
+				fid if fid is not None 
+				else obj.content.get(obj.keywords.get('filter_id', 'fid'))
 			)
+		return fids
+
+
+	def _get_cached(self, key, build):
+		"""
+		:param build: function computing the value to be cached
+		"""
+		if self._cache is None:
+			return build()
+
+		ret = self._cache.get(key)
+		if ret is None:
+			ret = build()
+			self._cache[key] = ret
+		return ret
+
+
+	def _get_photo_objs(self, filters, upper_limits):
+		"""	
+		"""	
+		photo_objs = self.ulo_list if upper_limits else self.ppo_list
+		if filters is None:
+			return photo_objs
+
+		mask = self._get_filter_mask(filters, upper_limits)
+		if mask is None:
+			return self._apply_filter(photo_objs, filters)
 
-		return match_objs
+		return tuple(compress(photo_objs, mask))
+
+
+	def _apply_filter(self, match_objs, filters):
+		"""
+		filters: dict or list of dicts, compiled and cached (see CompiledFilter)
+		"""
+		return CompiledFilter.for_photo_data(filters)(match_objs)
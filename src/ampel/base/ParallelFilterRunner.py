@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/ParallelFilterRunner.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import os, time, logging
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from ampel.base.AlertBatch import AlertBatch
+from ampel.base.AmpelAlert import AmpelAlert
+from ampel.base.PhotoData import PhotoData
+from ampel.base.abstract.AbsAlertFilter import AbsAlertFilter
+
+# Filter instances of the current worker process (see _init_worker)
+_worker_filters = None
+
+
+def _get_class_settings():
+	"""
+	:returns: class-level settings of AmpelAlert and PhotoData (set using ampel config values),
+	which worker processes do not inherit under the 'spawn' start method
+	"""
+	return AmpelAlert.alert_keywords, AmpelAlert.flags, PhotoData.default_keywords
+
+
+def _create_filters(filter_specs):
+	""" """
+	return [
+		klass(
+			on_match_t2_units, base_config, run_config,
+			logging.getLogger(klass.__name__)
+		)
+		for klass, on_match_t2_units, base_config, run_config in filter_specs
+	]
+
+
+def _init_worker(filter_specs, class_settings):
+	"""
+	Applies the class settings of the parent process (see _get_class_settings)
+	and instantiates the filters once per worker process
+	"""
+	global _worker_filters
+	alert_keywords, alert_flags, photo_keywords = class_settings
+	AmpelAlert.set_alert_keywords(alert_keywords)
+	AmpelAlert.set_class_flags(alert_flags)
+	PhotoData.set_keywords(photo_keywords)
+	_worker_filters = _create_filters(filter_specs)
+
+
+def _run_chunk(alerts, filters=None):
+	"""
+	:param filters: filter instances (default: those of the current worker process)
+	:returns: list containing, for each alert, a tuple with the result of each filter
+	"""
+	batch = None
+	results = []
+	for f in (_worker_filters if filters is None else filters):
+		if type(f).apply_batch is AbsAlertFilter.apply_batch:
+			results.append([f.apply(alert) for alert in alerts])
+		else:
+			# Units overriding apply_batch get a columnar batch (built once per chunk)
+			if batch is None:
+				batch = AlertBatch(alerts)
+			results.append(f.apply_batch(batch))
+	return list(zip(*results)) if results else [() for alert in alerts]
+
+
+class ParallelFilterRunner:
+	"""
+	Runs T0 filters on a stream of alerts using a pool of worker processes.
+	Alerts are dispatched in chunks, each worker instantiates every filter once
+	(from the provided specifications) and results are returned in input order.
+	The class-level settings of AmpelAlert and PhotoData (alert keywords, class flags,
+	photo keywords) are captured when the runner is created and applied in each worker,
+	so that results do not depend on the multiprocessing start method.
+	check() compares parallel and serial results for a sample of alerts.
+	At most max_pending chunks are in flight, so that arbitrarily long
+	alert iterators (see :py:class:`ampel.base.AvroAlertReader.AvroAlertReader`)
+	can be processed with constant memory.
+
+	Example:
+
+	.. sourcecode:: python
+
+		runner = ParallelFilterRunner(
+			[(MyFilter, {"SNCOSMO"}, None, {"MIN_NDET": 3})], processes=8, chunk_size=500
+		)
+		with runner:
+			for alert, (res, ) in runner.run(AvroAlertReader(path)):
+				...
+		print(runner.get_stats())
+	"""
+
+	def __init__(self,
+		filter_specs, processes=None, chunk_size=200, max_pending=None, logger=None, mp_context=None
+	):
+		"""
+		:param filter_specs: list of tuples (AbsAlertFilter subclass, on_match_t2_units, base_config, run_config)
+		:param processes: number of worker processes (default: number of CPUs)
+		:param chunk_size: number of alerts sent at once to a worker
+		:param max_pending: maximum number of chunks in flight (default: 2 * number of workers)
+		:param logger: instance of logging.Logger used to report throughput
+		:param mp_context: multiprocessing context, ex: multiprocessing.get_context('spawn')
+		(default: default start method of the platform)
+		"""
+		self.filter_specs = list(filter_specs)
+		self.chunk_size = chunk_size
+		self.logger = logger
+		self.processes = processes if processes is not None else os.cpu_count()
+		self.max_pending = max_pending if max_pending is not None else 2 * self.processes
+		self.executor = ProcessPoolExecutor(
+			max_workers=self.processes, mp_context=mp_context, initializer=_init_worker,
+			initargs=(self.filter_specs, _get_class_settings())
+		)
+		self.alerts = 0
+		self.chunks = 0
+		self.elapsed = 0.
+
+
+	def __enter__(self):
+		return self
+
+
+	def __exit__(self, *args):
+		self.close()
+
+
+	def close(self):
+		""" Shuts down the worker processes """
+		self.executor.shutdown()
+
+
+	def run(self, alerts):
+		"""
+		:param alerts: iterable of AmpelAlert instances
+		:returns: generator of tuples (alert, tuple of filter results), in input order.
+		Filter results are ordered like filter_specs.
+		"""
+		start = time.time()
+		pending = deque()
+		it = iter(alerts)
+
+		try:
+			while True:
+				while len(pending) < self.max_pending:
+					chunk = list(islice(it, self.chunk_size))
+					if not chunk:
+						break
+					pending.append((chunk, self.executor.submit(_run_chunk, chunk)))
+
+				if not pending:
+					break
+
+				chunk, future = pending.popleft()
+				results = future.result()
+				self.alerts += len(chunk)
+				self.chunks += 1
+				yield from zip(chunk, results)
+		finally:
+			for chunk, future in pending:
+				future.cancel()
+			self.elapsed += time.time() - start
+
+		if self.logger is not None:
+			self.logger.info(
+				"%i alerts (%i chunks) filtered in %.2fs (%.0f alerts/s)" %
+				(self.alerts, self.chunks, self.elapsed, self.get_throughput())
+			)
+
+
+	def run_serial(self, alerts):
+		"""
+		Same as run() but in the current process (no chunking, stats are not updated)
+		"""
+		alerts = list(alerts)
+		return zip(alerts, _run_chunk(alerts, _create_filters(self.filter_specs)))
+
+
+	def check(self, alerts):
+		"""
+		Runs the filters on the provided alerts both in parallel and serially.
+		:param alerts: iterable of AmpelAlert instances (typically a small sample)
+		:raises ValueError: if results differ (ex: worker state diverging from the parent process)
+		"""
+		alerts = list(alerts)
+		for i, ((alert, res), (_, expected)) in enumerate(
+			zip(self.run(alerts), self.run_serial(alerts))
+		):
+			if res != expected:
+				raise ValueError(
+					"Parallel and serial results differ for alert %i (%s): %s != %s" %
+					(i, alert.tran_id, res, expected)
+				)
+
+
+	def get_throughput(self):
+		""" :returns: number of processed alerts per second """
+		return self.alerts / self.elapsed if self.elapsed > 0 else 0.
+
+
+	def get_stats(self):
+		""" :returns: dict """
+		return {
+			'alerts': self.alerts,
+			'chunks': self.chunks,
+			'elapsed': self.elapsed,
+			'alerts_per_sec': self.get_throughput()
+		}
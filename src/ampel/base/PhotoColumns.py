@@ -0,0 +1,415 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/PhotoColumns.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import operator
+import numpy as np
+from collections.abc import Mapping, Sequence
+
+
+# Value types stored using native numpy types: (types, dtype, value of undefined entries)
+_kind_groups = (
+	(frozenset((bool, np.bool_)), bool, False),
+	(frozenset((int, np.int64, np.int32)), np.int64, 0),
+	(frozenset((float, np.float64, np.float32)), np.float64, np.nan)
+)
+
+
+def to_column(values):
+	"""
+	Converts a list of values (None standing for a missing value) into a tuple
+	(numpy array, boolean numpy array flagging the valid entries).
+	Bool, integer and float values are stored using native numpy types,
+	anything else (strings, nested structures) in an array of dtype object.
+	Values of different kinds (ex: bool and int, int and float) are not promoted
+	to a common numpy type but stored as is in an array of dtype object, so that
+	the columnar representation returns (and compares) the original values.
+	Missing entries of numeric arrays are filled with 0 (bool/int) or NaN (float).
+	"""
+	mask = np.fromiter((v is not None for v in values), dtype=bool, count=len(values))
+	kinds = {type(v) for v in values if v is not None}
+
+	dtype, fill = None, None
+	if kinds:
+		for types, group_dtype, group_fill in _kind_groups:
+			if kinds <= types:
+				dtype, fill = group_dtype, group_fill
+				break
+
+	if dtype is not None:
+		try:
+			arr = np.array(
+				[v if v is not None else fill for v in values], dtype=dtype
+			)
+		except OverflowError:
+			dtype = None
+
+	if dtype is None:
+		arr = np.empty(len(values), dtype=object)
+		# element-wise assignment prevents numpy from broadcasting nested sequences
+		for i, v in enumerate(values):
+			arr[i] = v
+
+	arr.flags.writeable = False
+	mask.flags.writeable = False
+	return arr, mask
+
+
+def concat_columns(cols):
+	"""
+	Concatenates columns created by to_column(), the resulting dtype being the one
+	to_column() would have chosen for all values (columns without any defined value 
+	do not constrain the resulting dtype, columns of different dtypes result in dtype object).
+	:param cols: sequence of tuples (numpy array, numpy bool mask)
+	:returns: tuple (read-only numpy array, read-only numpy bool mask)
+	"""
+	dtypes = {arr.dtype for arr, mask in cols if mask.any()}
+	dtype = dtypes.pop() if len(dtypes) == 1 else np.dtype(object)
+	fill = _fills.get(dtype.kind)
+
+	arrs = []
+	for arr, mask in cols:
+		if arr.dtype != dtype:
+			# astype(object) converts numpy scalars into python values
+			arr = arr.astype(object) if mask.any() else np.full(len(arr), fill, dtype=dtype)
+		arrs.append(arr)
+
+	arr = np.concatenate(arrs).astype(dtype, copy=False)
+	mask = np.concatenate([col[1] for col in cols])
+	arr.flags.writeable = False
+	mask.flags.writeable = False
+	return arr, mask
+
+
+# Values of undefined entries per numpy dtype kind (see to_column)
+_fills = {'b': False, 'i': 0, 'f': np.nan, 'O': None}
+
+
+def to_bits(flags):
+	"""
+	:param flags: flag (ex: PhotoFlags.SUPERSEDED), int, or list/tuple of flags
+	:returns: int with the bits of all provided flags set
+	"""
+	if isinstance(flags, (list, tuple, set)):
+		bits = 0
+		for f in flags:
+			bits |= int(f)
+		return bits
+	return int(flags)
+
+
+def flag_mask(arr, mask, any_of=None, all_of=None, none_of=None):
+	"""
+	Evaluates flag criteria on an integer array of flag values
+	using a single bitwise numpy operation per criterion.
+	:param arr: numpy array of flag values
+	:param mask: numpy bool array flagging the defined flag values
+	:param any_of: flag(s), at least one of which must be set (see to_bits)
+	:param all_of: flag(s) which must all be set
+	:param none_of: flag(s) which must not be set
+	:returns: numpy bool array flagging the rows with defined flag values
+	matching all provided criteria
+	"""
+	if mask.all():
+		sel = None
+	else:
+		sel = np.flatnonzero(mask)
+		arr = arr[sel]
+
+	m = np.ones(len(arr), dtype=bool)
+	if all_of is not None:
+		bits = to_bits(all_of)
+		m &= np.asarray((arr & bits) == bits, dtype=bool)
+	if any_of is not None:
+		m &= np.asarray((arr & to_bits(any_of)) != 0, dtype=bool)
+	if none_of is not None:
+		m &= np.asarray((arr & to_bits(none_of)) == 0, dtype=bool)
+
+	if sel is None:
+		return m
+
+	ret = np.zeros(len(mask), dtype=bool)
+	ret[sel] = m
+	return ret
+
+
+# Filter values compared to columns using numpy operations
+_scalar_types = (bool, int, float, str, np.bool_, np.number, type(None))
+
+
+def is_scalar(value):
+	"""
+	:returns: True if value can be compared to a whole column at once (see apply_op).
+	Other values, such as sequences, would be broadcasted by numpy against the column.
+	"""
+	return isinstance(value, _scalar_types)
+
+
+def apply_op(op, arr, value):
+	"""
+	Applies the provided binary operator (see AmpelAlert.ops) element-wise
+	:returns: numpy bool array
+	"""
+	# identity checks and non-scalar values cannot be handled by numpy, they are
+	# evaluated on python values (iterating over arr would yield numpy scalars: np.True_ is not True)
+	if op is operator.is_ or op is operator.is_not or not isinstance(value, _scalar_types):
+		return np.fromiter((bool(op(v, value)) for v in arr.tolist()), dtype=bool, count=len(arr))
+	return np.asarray(op(arr, value), dtype=bool)
+
+
+def column_mask(arr, mask, op, value):
+	"""
+	:param arr: column values
+	:param mask: numpy bool array flagging the defined values of arr
+	:returns: numpy bool array flagging the rows where the value
+	is defined and op(value, provided value) is True
+	"""
+	if mask.all():
+		return apply_op(op, arr, value)
+
+	ret = np.zeros(len(arr), dtype=bool)
+	sel = np.flatnonzero(mask)
+	ret[sel] = apply_op(op, arr[sel], value)
+	return ret
+
+
+class PhotoRow(Mapping):
+	"""
+	Read-only dict-like view on a single row of a PhotoColumns instance.
+	Allows code written against the MappingProxyType based API
+	(el['magpsf'], 'magpsf' in el, el.get('fid')) to work with columnar data.
+	"""
+
+	__slots__ = ('_cols', '_idx')
+
+	def __init__(self, cols, idx):
+		self._cols = cols
+		self._idx = idx
+
+	def __getitem__(self, key):
+		arr, mask = self._cols.columns[key]
+		if not mask[self._idx]:
+			if key in self:
+				return None
+			raise KeyError(key)
+		return arr[self._idx] if arr.dtype == object else arr[self._idx].item()
+
+	def __contains__(self, key):
+		present = self._cols.present.get(key)
+		if present is None:
+			col = self._cols.columns.get(key)
+			if col is None:
+				return False
+			present = col[1]
+		return bool(present[self._idx])
+
+	def __iter__(self):
+		idx = self._idx
+		present = self._cols.present
+		return (k for k, (arr, mask) in self._cols.columns.items() if present.get(k, mask)[idx])
+
+	def __len__(self):
+		return sum(1 for k in self)
+
+	def __repr__(self):
+		return "PhotoRow(%r)" % dict(self)
+
+
+class PhotoColumns(Sequence):
+	"""
+	Struct-of-arrays representation of a list of photopoint (or upper limit) dicts.
+	Each field is stored once as a read-only numpy array along with a boolean mask
+	flagging the rows where the field is defined (missing keys and None values
+	are both considered undefined, see get_values()).
+	Rows containing a field with value None are tracked separately (see attribute present),
+	so that rows (see PhotoRow) and get_mask() follow the semantics of the original dicts:
+	instances behave like a read-only sequence of read-only dicts
+	and the dict based API of AmpelAlert keeps working on top of it.
+	"""
+
+	__slots__ = ('columns', 'length', 'present')
+
+	@classmethod
+	def from_dicts(cls, dicts):
+		"""
+		:param dicts: sequence of dict instances
+		:returns: PhotoColumns instance
+		"""
+		fields = {}
+		nulls = set()
+		for d in dicts:
+			for k, v in d.items():
+				fields[k] = None
+				if v is None:
+					nulls.add(k)
+
+		present = {}
+		for k in nulls:
+			present[k] = np.fromiter((k in d for d in dicts), dtype=bool, count=len(dicts))
+			present[k].flags.writeable = False
+
+		return cls(
+			{k: to_column([d.get(k) for d in dicts]) for k in fields},
+			len(dicts), present
+		)
+
+
+	@classmethod
+	def concatenate(cls, parts):
+		"""
+		:param parts: sequence of PhotoColumns instances and/or sequences of dicts
+		:returns: tuple (PhotoColumns instance, numpy array of offsets with length len(parts)+1).
+		Rows of part i are located between offsets[i] and offsets[i+1].
+		"""
+		lengths = [len(p) for p in parts]
+		offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+		np.cumsum(lengths, out=offsets[1:])
+
+		# Build columns in one go if no part is columnar already
+		if not any(isinstance(p, PhotoColumns) for p in parts):
+			return cls.from_dicts([d for p in parts for d in p]), offsets
+
+		parts = [p if isinstance(p, PhotoColumns) else cls.from_dicts(p) for p in parts]
+		fields = dict.fromkeys(k for p in parts for k in p.columns)
+
+		# Parts not defining a field (or containing only undefined values)
+		# do not constrain the dtype of the concatenated column, see concat_columns()
+		cols = {
+			k: concat_columns([
+				p.columns[k] if k in p.columns else
+				(np.empty(p.length, dtype=object), np.zeros(p.length, dtype=bool))
+				for p in parts
+			])
+			for k in fields
+		}
+
+		present = {}
+		for k in dict.fromkeys(k for p in parts for k in p.present):
+			present[k] = np.concatenate([
+				p.present[k] if k in p.present else
+				p.columns[k][1] if k in p.columns else np.zeros(p.length, dtype=bool)
+				for p in parts
+			])
+			present[k].flags.writeable = False
+
+		return cls(cols, int(offsets[-1]), present), offsets
+
+
+	def __init__(self, columns, length, present=None):
+		"""
+		:param columns: dict: field name -> (numpy array, numpy bool mask)
+		:param length: number of rows
+		:param present: dict: field name -> numpy bool array flagging the rows containing the field,
+		None values included. Only required for fields with None values (default: mask of the column).
+		"""
+		self.columns = columns
+		self.length = length
+		self.present = present if present is not None else {}
+
+
+	def __len__(self):
+		return self.length
+
+
+	def __getitem__(self, idx):
+		if isinstance(idx, slice):
+			return self.select(idx)
+		if idx < 0:
+			idx += self.length
+		if not 0 <= idx < self.length:
+			raise IndexError("PhotoColumns index out of range")
+		return PhotoRow(self, idx)
+
+
+	def __repr__(self):
+		return "PhotoColumns(length=%i, fields=%s)" % (self.length, list(self.columns))
+
+
+	def get_fields(self):
+		""" returns a tuple of field names """
+		return tuple(self.columns)
+
+
+	def get_column(self, field):
+		"""
+		:returns: tuple (numpy array, numpy bool mask) or None if field is unknown
+		"""
+		return self.columns.get(field)
+
+
+	def select(self, idx):
+		"""
+		:param idx: boolean mask, index array or slice
+		:returns: new PhotoColumns instance containing the selected rows
+		"""
+		cols = {}
+		for k, (arr, mask) in self.columns.items():
+			sub_arr, sub_mask = arr[idx], mask[idx]
+			sub_arr.flags.writeable = False
+			sub_mask.flags.writeable = False
+			cols[k] = (sub_arr, sub_mask)
+
+		present = {}
+		for k, arr in self.present.items():
+			present[k] = arr[idx]
+			present[k].flags.writeable = False
+
+		if isinstance(idx, slice):
+			length = len(range(*idx.indices(self.length)))
+		else:
+			idx = np.asarray(idx)
+			length = int(idx.sum()) if idx.dtype == bool else len(idx)
+
+		return PhotoColumns(cols, length, present)
+
+
+	def get_mask(self, field, op, value):
+		"""
+		:param op: binary operator, for example operator.gt
+		:returns: numpy bool array flagging the rows containing the field
+		for which op(field value, value) is True (None values included, like for dicts)
+		"""
+		col = self.columns.get(field)
+		if col is None:
+			return np.zeros(self.length, dtype=bool)
+		ret = column_mask(col[0], col[1], op, value)
+		present = self.present.get(field)
+		if present is not None and op(None, value):
+			ret |= present & ~col[1]
+		return ret
+
+
+	def get_values(self, field):
+		"""
+		:returns: numpy array of the defined values of the provided field.
+		The returned array is a view of the underlying storage if the field
+		is defined for every row.
+		"""
+		col = self.columns.get(field)
+		if col is None:
+			return np.empty(0)
+		arr, mask = col
+		return arr if mask.all() else arr[mask]
+
+
+	def get_ntuples(self, fields):
+		"""
+		:returns: 2D numpy array with shape (number of rows defining all fields, len(fields))
+		"""
+		cols = [self.columns.get(field) for field in fields]
+		if any(col is None for col in cols):
+			return np.empty((0, len(fields)))
+
+		mask = cols[0][1]
+		for col in cols[1:]:
+			mask = mask & col[1]
+
+		if mask.all():
+			return np.stack([col[0] for col in cols], axis=1)
+
+		return np.stack([col[0][mask] for col in cols], axis=1)
@@ -4,11 +4,12 @@
 # License           : BSD-3-Clause
 # Author            : vb <vbrinnel@physik.hu-berlin.de>
 # Date              : 13.01.2018
-# Last Modified Date: 04.07.2018
+# Last Modified Date: 18.10.2026
 # Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
 
 from types import MappingProxyType
 from ampel.base.Frozen import Frozen
+from ampel.base.KeywordAccessor import KeywordAccessor
 from ampel.base.flags.PhotoFlags import PhotoFlags
 
 class PhotoData(Frozen):
@@ -21,7 +22,9 @@ class PhotoData(Frozen):
 	content is encoded in a one-dimensional dict. 
 	The mapping between - let's call them ampel keywords such as 'mag'
 	and the keywords of the underlying photopoint dict (for ZTF-IPAC 'magpsf')
-	is achieved using the static variable 'default_keywords'
+	is achieved using the static variable 'default_keywords'.
+	Keyword resolution for several fields at once is compiled and cached
+	(see get_accessor() and :py:class:`ampel.base.KeywordAccessor.KeywordAccessor`).
 	"""
 
 	default_keywords = {
@@ -36,30 +39,63 @@ class PhotoData(Frozen):
 		}
 	}
 
+	# Shared by instances without keyword mapping
+	_no_keywords = MappingProxyType({})
+
+	# pylint: disable=no-member
+	_ztf_ipac = PhotoFlags.INST_ZTF|PhotoFlags.SRC_IPAC
+
+	__slots__ = ('keywords', 'flags', 'content')
+
 	@classmethod
 	def set_keywords(cls, keywords):
 		""" Usually set using ampel config values. """
 		PhotoData.default_keywords = keywords
+		KeywordAccessor.clear_cache()
+
+
+	@staticmethod
+	def get_accessor(keywords, params):
+		"""
+		:param keywords: keyword mapping of PhotoData instance(s) (attribute 'keywords')
+		:param params: tuple of field names
+		:returns: cached :py:class:`ampel.base.KeywordAccessor.KeywordAccessor` instance
+		"""
+		return KeywordAccessor.get_accessor(keywords, params)
 
 
 	def __init__(self, content, flags=None, read_only=True):
 
 		# Check flags and set field keywords accordingly
-	        # pylint: disable=no-member
-		if flags is not None and PhotoFlags.INST_ZTF|PhotoFlags.SRC_IPAC in flags:
+		if flags is not None and PhotoData._ztf_ipac in flags:
 			self.keywords = PhotoData.default_keywords['ZTFIPAC']
 		else:
-			self.keywords = {}
+			self.keywords = PhotoData._no_keywords
 
 		self.flags = flags
 
 		# Check wether to freeze this instance.
 		if read_only:
 			self.content = MappingProxyType(content)
-			self.__isfrozen = True
+			self._freeze()
 		else:
 			self.content = content
 
+
+	def __getstate__(self):
+		""" MappingProxyType instances cannot be pickled """
+		state = Frozen.__getstate__(self)
+		state['content'] = dict(self.content)
+		return state
+
+
+	def __setstate__(self, state):
+		""" """
+		if state['_isfrozen']:
+			state['content'] = MappingProxyType(state['content'])
+		Frozen.__setstate__(self, state)
+
+
 	def serialize(self):
 		return {"content": self.content, "flags": self.flags}
 
@@ -67,23 +103,22 @@ class PhotoData(Frozen):
 		"""
 		"""
 		return self.content[
-			self.keywords[field_name] if field_name in self.keywords	
-			else field_name
+			self.keywords.get(field_name, field_name)
 		]
 
 
 	def get_tuple(self, field1_name, field2_name):
 		""" """
-		return (
-			self.content[
-				self.keywords[field1_name] if field1_name in self.keywords 
-				else field1_name
-			], 
-			self.content[
-				self.keywords[field2_name] if field2_name in self.keywords 
-				else field2_name
-			]
-		)
+		return KeywordAccessor.get_accessor(
+			self.keywords, (field1_name, field2_name)
+		).get(self.content)
+
+
+	def get_ntuple(self, params):
+		"""
+		:param params: tuple of field names
+		"""
+		return KeywordAccessor.get_accessor(self.keywords, params).get(self.content)
 	
 
 	def has_flags(self, arg_flags):
@@ -95,19 +130,20 @@ class PhotoData(Frozen):
 		if self.flags is None:
 			return False
 
+		# bitwise checks on ints are much faster than IntFlag 'in' checks
+		flags = int(self.flags)
+
 		if type(arg_flags) is list:
-			return [f for f in arg_flags in self.flags if f in self.flags]
+			return [flags & int(f) == int(f) for f in arg_flags]
 
-		return arg_flags in self.flags
+		bits = int(arg_flags)
+		return flags & bits == bits
 
 
 	def has_parameter(self, field_name):
 		"""
 		"""
-		return (
-			field_name in self.content if field_name not in self.keywords
-			else self.keywords[field_name] in self.content 
-		)
+		return self.keywords.get(field_name, field_name) in self.content
 
 
 	def get_id(self):
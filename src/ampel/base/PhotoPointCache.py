@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/PhotoPointCache.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+from collections import OrderedDict
+from types import MappingProxyType
+from ampel.base.AmpelAlert import AmpelAlert
+
+
+class PhotoPointCache:
+	"""
+	LRU-bounded pool of read-only photopoints keyed by photopoint id
+	(AmpelAlert.alert_keywords['photopoint_id'], for ZTF: 'candid').
+
+	ZTF alerts repeat the detections of the last 30 days (prv_candidates).
+	Interning photopoints when creating alerts (see AmpelAlert.load_from_avro_content)
+	makes successive alerts of a transient share the same MappingProxyType instances,
+	the redundant dicts created by the avro decoder being released right away.
+
+	A cached photopoint is only returned if it contains at least as many fields as
+	the provided one ('candidate' records contain more fields than 'prv_candidates' records).
+	"""
+
+	def __init__(self, max_size=500000, id_key=None):
+		"""
+		:param max_size: maximum number of photopoints kept in the pool
+		:param id_key: photopoint dict key containing the photopoint id
+		(default: resolved using the alert keywords set at instantiation time)
+		"""
+		self.max_size = max_size
+		self.id_key = (
+			id_key if id_key is not None 
+			else AmpelAlert.alert_keywords.get('photopoint_id', 'candid')
+		)
+		self.hits = 0
+		self.misses = 0
+		self._pool = OrderedDict()
+
+
+	def __len__(self):
+		return len(self._pool)
+
+
+	def intern(self, pp):
+		"""
+		:param pp: photopoint dict
+		:returns: MappingProxyType instance
+		"""
+		key = pp.get(self.id_key)
+		if key is None:
+			return MappingProxyType(pp)
+
+		ro_pp = self._pool.get(key)
+		if ro_pp is not None and len(ro_pp) >= len(pp):
+			self.hits += 1
+			self._pool.move_to_end(key)
+			return ro_pp
+
+		self.misses += 1
+		ro_pp = MappingProxyType(pp)
+		self._pool[key] = ro_pp
+		self._pool.move_to_end(key)
+
+		if len(self._pool) > self.max_size:
+			self._pool.popitem(last=False)
+
+		return ro_pp
+
+
+	def intern_all(self, pps):
+		"""
+		:param pps: iterable of photopoint dicts
+		:returns: tuple of MappingProxyType instances
+		"""
+		return tuple(self.intern(pp) for pp in pps)
+
+
+	def clear(self):
+		""" """
+		self._pool.clear()
+		self.hits = 0
+		self.misses = 0
+
+
+	def get_hit_rate(self):
+		""" :returns: float between 0 and 1 """
+		total = self.hits + self.misses
+		return self.hits / total if total else 0.
+
+
+	def get_stats(self):
+		""" :returns: dict """
+		return {
+			'size': len(self._pool),
+			'hits': self.hits,
+			'misses': self.misses,
+			'hit_rate': self.get_hit_rate()
+		}
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/PhotoPool.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import numpy as np
+from ampel.base.PooledSequence import PooledSequence
+
+
+class PhotoPool:
+	"""
+	Collection of unique photopoints (or upper limits) of a transient, keyed by id
+	(PhotoData.get_id()). The first instance registered for a given id is kept,
+	instances with the same id provided afterwards are replaced by it.
+	Light curves reference the pooled instances through compact index arrays
+	(see get_sequence() and TransientView.build()).
+
+	Example:
+
+	.. sourcecode:: python
+
+		pool = PhotoPool(pps.values())
+		lc = LightCurve(compound_id, pool.get_sequence(ppo_list), ...)
+	"""
+
+	__slots__ = ('objs', 'positions')
+
+
+	def __init__(self, objs=()):
+		"""
+		:param objs: iterable of PhotoData instances
+		"""
+		self.objs = []
+		self.positions = {}
+		for obj in objs:
+			self.add(obj)
+
+
+	def __len__(self):
+		return len(self.objs)
+
+
+	def add(self, obj):
+		"""
+		:param obj: PhotoData instance
+		:returns: position of the pooled instance with the same id
+		"""
+		key = obj.get_id()
+		pos = self.positions.get(key)
+		if pos is None:
+			pos = len(self.objs)
+			self.positions[key] = pos
+			self.objs.append(obj)
+		return pos
+
+
+	def get(self, obj_id):
+		"""
+		:returns: pooled instance with the provided id or None
+		"""
+		pos = self.positions.get(obj_id)
+		return self.objs[pos] if pos is not None else None
+
+
+	def get_sequence(self, objs):
+		"""
+		:param objs: iterable of PhotoData instances (added to the pool if unknown)
+		:returns: PooledSequence instance referencing the pooled instances
+		"""
+		idx = np.fromiter(map(self.add, objs), dtype=np.int32)
+		idx.flags.writeable = False
+		return PooledSequence(self.objs, idx)
+
+
+	def get_dict(self):
+		"""
+		:returns: dict: id -> pooled instance
+		"""
+		objs = self.objs
+		return {key: objs[pos] for key, pos in self.positions.items()}
@@ -4,7 +4,7 @@
 # License           : BSD-3-Clause
 # Author            : vb <vbrinnel@physik.hu-berlin.de>
 # Date              : 13.01.2018
-# Last Modified Date: 08.06.2018
+# Last Modified Date: 18.10.2026
 # Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
 
 from ampel.base.PhotoData import PhotoData
@@ -15,6 +15,8 @@ class PlainPhotoPoint(PhotoData):
 	Please see PhotoData docstring for more info.
 	"""
 
+	__slots__ = ()
+
 	def get_mag(self):
 		"""
 		"""
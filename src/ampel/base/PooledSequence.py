@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/PooledSequence.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+from collections.abc import Sequence
+
+
+class PooledSequence(Sequence):
+	"""
+	Immutable sequence referencing elements of a 
+	:py:class:`ampel.base.PhotoPool.PhotoPool` through an integer index array.
+	Instances are created by PhotoPool.get_sequence().
+	"""
+
+	__slots__ = ('objs', 'idx')
+
+
+	def __init__(self, objs, idx):
+		"""
+		:param objs: list of pooled objects (append-only, shared with the pool)
+		:param idx: read-only numpy integer array of positions in objs
+		"""
+		self.objs = objs
+		self.idx = idx
+
+
+	def __len__(self):
+		return len(self.idx)
+
+
+	def __iter__(self):
+		return map(self.objs.__getitem__, self.idx.tolist())
+
+
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return tuple(map(self.objs.__getitem__, self.idx[i].tolist()))
+		return self.objs[self.idx[i]]
+
+
+	def __eq__(self, other):
+		if isinstance(other, (PooledSequence, tuple)):
+			return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+		return NotImplemented
+
+
+	def __hash__(self):
+		return hash(tuple(self))
+
+
+	def __repr__(self):
+		return "PooledSequence(%i elements)" % len(self.idx)
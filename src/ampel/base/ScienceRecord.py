@@ -4,12 +4,15 @@
 # License           : BSD-3-Clause
 # Author            : vb <vbrinnel@physik.hu-berlin.de>
 # Date              : 13.01.2018
-# Last Modified Date: 16.08.2018
+# Last Modified Date: 18.10.2026
 # Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict
+from collections.abc import Mapping
 from bson import Binary
+from ampel.base.PhotoColumns import to_column
 
 
 @dataclass(frozen=True)
@@ -44,4 +47,82 @@ class ScienceRecord:
 
 	def has_error(self):
 		""" """
-		return self.info.get('hasError', False)
+		return self.info.get('hasError', False) if self.info is not None else False
+
+
+	@staticmethod
+	def extract_many(records, path, index=-1, skip_errors=True):
+		"""
+		Extracts a (nested) value from the results of many science records at once.
+		ex: z, mask = ScienceRecord.extract_many(records, "output.fit_results.z")
+
+		:param records: sequence of ScienceRecord instances (None: no record)
+		:param path: string with keys separated by dots (digits: list indexes) 
+		or sequence of keys, see compile_path()
+		:param index: index of the result the path is applied to, for records 
+		whose results is a list (default: -1, that is the latest result)
+		:param skip_errors: whether to skip records with error (see has_error())
+		:returns: tuple (read-only numpy array with one entry per record, numpy bool mask
+		flagging the records defining the path), see PhotoColumns.to_column
+		"""
+		get = ScienceRecord.compile_path(path if isinstance(path, str) else tuple(path))
+		values = []
+		for sr in records:
+			if sr is None or (skip_errors and sr.info is not None and sr.info.get('hasError', False)):
+				values.append(None)
+				continue
+			res = sr.results
+			if type(res) is list or type(res) is tuple:
+				try:
+					res = res[index]
+				except IndexError:
+					values.append(None)
+					continue
+			values.append(get(res))
+
+		return to_column(values)
+
+
+	@staticmethod
+	@lru_cache(maxsize=1024)
+	def compile_path(path):
+		"""
+		:param path: string with keys separated by dots or tuple of keys.
+		Keys consisting of digits (possibly with a leading '-') are used as indexes 
+		of lists/tuples, and as dict keys (str form first, then int) otherwise.
+		:returns: cached function accepting a (nested) dict/list and returning the value 
+		located at the provided path, or None if the path does not exist.
+		Resolution stops (returning None) at values which are neither dict-like nor list/tuple
+		(strings, numbers, ...) if keys remain.
+		"""
+		keys = []
+		for k in (path.split('.') if isinstance(path, str) else path):
+			if isinstance(k, str) and k.lstrip('-').isdigit():
+				keys.append((int(k), (k, int(k))))
+			elif type(k) is int:
+				keys.append((k, (str(k), k)))
+			else:
+				keys.append((None, (k, )))
+		keys = tuple(keys)
+
+		def get(obj):
+			for idx, dict_keys in keys:
+				if isinstance(obj, (list, tuple)):
+					if idx is None:
+						return None
+					try:
+						obj = obj[idx]
+					except IndexError:
+						return None
+				elif isinstance(obj, Mapping):
+					for k in dict_keys:
+						if k in obj:
+							obj = obj[k]
+							break
+					else:
+						return None
+				else:
+					return None
+			return obj
+
+		return get
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/TimeIndex.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+from bisect import bisect_left, bisect_right
+
+
+class TimeIndex:
+	"""
+	Observation dates sorted once, allowing time window queries
+	in O(log n + k) using bisection.
+	Used (and cached) by the frozen LightCurve and AmpelAlert instances.
+	"""
+
+	__slots__ = ('times', 'order', 'items')
+
+	def __init__(self, times, objs=None, positions=None):
+		"""
+		:param times: sequence of observation dates
+		:param objs: optional sequence of objects associated with the provided times
+		:param positions: optional sequence of positions associated with the provided times
+		(default: range(len(times))), returned by get_positions()
+		"""
+		order = sorted(range(len(times)), key=times.__getitem__)
+		self.times = [times[i] for i in order]
+		self.items = tuple(objs[i] for i in order) if objs is not None else None
+		self.order = [positions[i] for i in order] if positions is not None else order
+
+
+	def extended(self, times, objs=None, positions=None):
+		"""
+		:param times: observation dates of the added objects
+		:param objs: added objects (must be provided if this instance references objects)
+		:param positions: positions of the added objects
+		:returns: new TimeIndex instance referencing the objects of this instance 
+		and the added ones. Merging is linear (and trivial if the added times are 
+		not anterior to the indexed ones, which is the usual case).
+		"""
+		new = TimeIndex(times, objs, positions)
+		ti = TimeIndex.__new__(TimeIndex)
+
+		if not self.times or not new.times or new.times[0] >= self.times[-1]:
+			ti.times = self.times + new.times
+			ti.order = self.order + new.order
+			ti.items = self.items + new.items if self.items is not None else None
+		else:
+			# Timsort merges the two sorted runs in linear time (stable: ties keep insertion order)
+			times = self.times + new.times
+			order = self.order + new.order
+			merged = sorted(range(len(times)), key=times.__getitem__)
+			ti.times = [times[i] for i in merged]
+			ti.order = [order[i] for i in merged]
+			if self.items is not None:
+				items = self.items + new.items
+				ti.items = tuple(items[i] for i in merged)
+			else:
+				ti.items = None
+
+		return ti
+
+
+	def __len__(self):
+		return len(self.times)
+
+
+	def get_slice(self, start=None, end=None):
+		"""
+		:returns: slice of the sorted positions whose time is within [start, end]
+		(None meaning unbounded)
+		"""
+		return slice(
+			0 if start is None else bisect_left(self.times, start),
+			len(self.times) if end is None else bisect_right(self.times, end)
+		)
+
+
+	def get_before_slice(self, time, inclusive=False):
+		""" :returns: slice of the sorted positions whose time is < (or <=) time """
+		return slice(
+			0, bisect_right(self.times, time) if inclusive else bisect_left(self.times, time)
+		)
+
+
+	def get_after_slice(self, time, inclusive=False):
+		""" :returns: slice of the sorted positions whose time is > (or >=) time """
+		return slice(
+			bisect_left(self.times, time) if inclusive else bisect_right(self.times, time),
+			len(self.times)
+		)
+
+
+	def get_positions(self, sl):
+		""" :returns: original positions of the objects within the provided slice, sorted by time """
+		return self.order[sl]
+
+
+	def get_items(self, sl):
+		""" :returns: tuple of objects within the provided slice, sorted by time """
+		return self.items[sl]
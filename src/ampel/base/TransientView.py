@@ -4,7 +4,7 @@
 # License           : BSD-3-Clause
 # Author            : vb <vbrinnel@physik.hu-berlin.de>
 # Date              : 13.01.2018
-# Last Modified Date: 13.11.2018
+# Last Modified Date: 18.10.2026
 # Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
 
 import warnings
@@ -14,8 +14,10 @@ from typing import Dict, Optional
 
 from ampel.base.Frozen import Frozen
 from ampel.base.LightCurve import LightCurve
+from ampel.base.PhotoPool import PhotoPool
 from ampel.base.PlainPhotoPoint import PlainPhotoPoint
 from ampel.base.PlainUpperLimit import PlainUpperLimit
+from ampel.utils.tabular import columns_to_arrow, columns_to_pandas
 
 class TransientView(Frozen):
 	"""
@@ -29,8 +31,16 @@ class TransientView(Frozen):
 	
 	Instances of this class are provided to T3 modules and are typically 
 	generated using a TransientData instance created by DBContentLoader.
+
+	Lookups by id (compounds, lightcurves), by T2 unit id / compound id (science records) 
+	and by tier / T3 job name (journal) use dict indexes built on first use.
 	"""
 
+	__slots__ = (
+		'tran_id', 'tran_names', 'flags', 'journal', 'latest_state', 'photopoints', 
+		'upperlimits', 'compounds', 'lightcurves', 't2records', 'channel', '_cache'
+	)
+
 	def __init__(self, 
 		tran_id, flags, journal, tran_names=None, latest_state=None,
 		photopoints=None, upperlimits=None, compounds=None, 
@@ -49,7 +59,46 @@ class TransientView(Frozen):
 		self.lightcurves = lightcurves
 		self.t2records = t2records
 		self.channel = channel
-		self.__isfrozen = True
+
+		# Lazily computed indexes (see _get_index)
+		self._cache = {}
+		self._freeze()
+
+
+	@classmethod
+	def build(cls,
+		tran_id, flags, journal, tran_names=None, latest_state=None,
+		photopoints=None, upperlimits=None, compounds=None, 
+		lightcurves=None, t2records=None, channel=None
+	):
+		"""
+		Same parameters as the constructor. 
+		Guarantees that each photopoint and upper limit exists exactly once:
+		the instances of the provided lightcurves are replaced by the instances
+		of the dicts photopoints/upperlimits with the same id (see PhotoPool) 
+		and lightcurves reference them through integer index arrays.
+		Lightcurves are typically loaded for dozens of compounds per transient,
+		so that the photometric data would otherwise be duplicated as often.
+		"""
+		if lightcurves:
+			pp_pool = PhotoPool(photopoints.values() if photopoints else ())
+			ul_pool = PhotoPool(upperlimits.values() if upperlimits else ())
+			lightcurves = tuple(
+				LightCurve(
+					lc.id, pp_pool.get_sequence(lc.ppo_list), 
+					ul_pool.get_sequence(lc.ulo_list), lc.info
+				)
+				for lc in lightcurves
+			)
+			if photopoints is not None or len(pp_pool):
+				photopoints = pp_pool.get_dict()
+			if upperlimits is not None or len(ul_pool):
+				upperlimits = ul_pool.get_dict()
+
+		return cls(
+			tran_id, flags, journal, tran_names, latest_state, photopoints, 
+			upperlimits, compounds, lightcurves, t2records, channel
+		)
 
 
 	def serialize(self):
@@ -82,7 +131,7 @@ class TransientView(Frozen):
 			warn('Request for latest lightcurve cannot complete (No lightcurve was loaded)')
 			return None
 
-		res = next(filter(lambda x: x.id == self.latest_state, self.lightcurves), None)
+		res = self._get_index('lightcurves').get(self.latest_state)
 		if res is None:
 			warn(
 				'Request for latest lightcurve cannot complete (Lightcurve %s not found)' % 
@@ -129,7 +178,7 @@ class TransientView(Frozen):
 		"""
 		if type(compound_id) is str:
 			compound_id = Binary(bytes.fromhex(compound_id), 5)
-		return next(filter(lambda x: x.id == compound_id, self.compounds), None)
+		return self._get_index('compounds').get(compound_id)
 
 
 	def get_lightcurves(self):
@@ -147,7 +196,37 @@ class TransientView(Frozen):
 		"""
 		if type(lightcurve_id) is str:
 			lightcurve_id = Binary(bytes.fromhex(lightcurve_id), 5)
-		return next(filter(lambda x: x.id == lightcurve_id, self.lightcurves), None)
+		return self._get_index('lightcurves').get(lightcurve_id)
+
+
+	def get_columns(self, fields=None, upper_limits=False):
+		"""
+		Columnar representation of all the photopoints (or upper limits) of this transient
+		:param fields: list/tuple of field names (default: all fields of the points)
+		:returns: dict: field name -> tuple (read-only numpy array, numpy bool mask), 
+		see :py:meth:`ampel.base.LightCurve.LightCurve.to_arrays`
+		"""
+		photo_objs = self.upperlimits if upper_limits else self.photopoints
+		objs = list(photo_objs.values()) if photo_objs else []
+		lc = LightCurve(self.tran_id, [], objs, read_only=False) if upper_limits \
+			else LightCurve(self.tran_id, objs, read_only=False)
+		return lc.get_columns(fields, upper_limits)
+
+
+	def to_arrow(self, fields=None, upper_limits=False):
+		"""
+		:returns: pyarrow.Table, see get_columns(). Requires the optional dependency pyarrow.
+		Several transients can be exported into one table using :py:func:`ampel.utils.tabular.concat_to_arrow`
+		"""
+		return columns_to_arrow(self.get_columns(fields, upper_limits))
+
+
+	def to_pandas(self, fields=None, upper_limits=False):
+		"""
+		:returns: pandas.DataFrame, see get_columns(). Requires the optional dependency pandas.
+		Several transients can be exported into one DataFrame using :py:func:`ampel.utils.tabular.concat_to_pandas`
+		"""
+		return columns_to_pandas(self.get_columns(fields, upper_limits))
 
 
 	def get_science_records(self, t2_unit_id=None, latest=False):
@@ -161,31 +240,18 @@ class TransientView(Frozen):
 			if self.latest_state is None:
 				return None
 		
-			if t2_unit_id is None:
-				return next(
-					filter(
-						lambda x: self.latest_state in x.compound_id,
-						self.t2records
-					), None
-				)
-			else:
-				return next(
-					filter(
-						lambda x: self.latest_state in x.compound_id and x.t2_unit_id == t2_unit_id,
-						self.t2records
-					), None
-				)
+			records = self._get_index('t2records').get(
+				self.latest_state if t2_unit_id is None 
+				else (t2_unit_id, self.latest_state)
+			)
+			return records[0] if records else None
+
 		else:
 
 			if t2_unit_id is None:
 				return self.t2records
 			else:
-				return tuple(
-					filter(
-						lambda x: x.t2_unit_id == t2_unit_id,
-						self.t2records
-					)
-				)
+				return self._get_index('t2records').get((t2_unit_id, ), ())
 
 
 	def get_journal_entries(self, tier=None, t3JobName=None, filterFunc=None, latest=False):
@@ -198,29 +264,70 @@ class TransientView(Frozen):
 			:param filteFunc: callable: je --> bool, used to filter according to filteFunc(je).
 			:param latest: bool, return just the last entry in the journal.
 		"""
-		if tier is None and t3JobName is None and filterFunc is None:
-			entries = self.journal
-		elif not filterFunc is None:
+		if not filterFunc is None:
 			entries = tuple(filter(filterFunc, self.journal))
-		else:
-			if None in (tier, t3JobName):
-				entries = (
-					tuple(filter(lambda x: x.get('t3JobName') == t3JobName, self.journal)) if tier is None
-					else tuple(filter(lambda x: x.get('tier') == tier, self.journal))
-				)
-			else:
-				entries = tuple(filter(
-					lambda x: x.get('tier') == tier and x.get('t3JobName') == t3JobName, self.journal
-				))
+			if len(entries) == 0:
+				return None
+			return max(reversed(entries), key=lambda x: x['dt']) if latest else entries
 
-		if len(entries) == 0:
+		key = (tier is not None, t3JobName is not None, tier, t3JobName)
+		entries = self._get_index('journal').get(key)
+		if entries is None:
 			return None
 
 		if not latest:
 			return entries
+
+		# entries sorted by dt (stable sort), computed once per query
+		sorted_entries = self._cache.get(('journal', key))
+		if sorted_entries is None:
+			sorted_entries = tuple(sorted(entries, key=lambda x: x['dt']))
+			self._cache[('journal', key)] = sorted_entries
+
+		return sorted_entries[-1]
+
+
+	def _get_index(self, name):
+		"""
+		:param name: 'compounds', 'lightcurves', 't2records' or 'journal'
+		:returns: dict index built on first use:
+		- compounds, lightcurves: id -> first instance with this id
+		- t2records: compound id, (t2 unit id, ) and (t2 unit id, compound id) 
+		  -> tuple of science records (in original order)
+		- journal: (tier set, t3JobName set, tier, t3JobName) -> tuple of entries (in journal order)
+		"""
+		index = self._cache.get(name)
+		if index is not None:
+			return index
+
+		index = {}
+		objs = getattr(self, name)
+
+		if objs is None:
+			pass
+
+		elif name in ('compounds', 'lightcurves'):
+			for obj in objs:
+				index.setdefault(obj.id, obj)
+
+		elif name == 't2records':
+			for sr in objs:
+				for key in (sr.compound_id, (sr.t2_unit_id, ), (sr.t2_unit_id, sr.compound_id)):
+					index.setdefault(key, []).append(sr)
+			index = {k: tuple(v) for k, v in index.items()}
+
 		else:
-			return sorted(entries, key=lambda x: x['dt'])[-1]
-#		return entries[-1] if latest else entries
+			for entry in objs:
+				tier, job = entry.get('tier'), entry.get('t3JobName')
+				for key in (
+					(False, False, None, None), (True, False, tier, None), 
+					(False, True, None, job), (True, True, tier, job)
+				):
+					index.setdefault(key, []).append(entry)
+			index = {k: tuple(v) for k, v in index.items()}
+
+		self._cache[name] = index
+		return index
 
 
 	def get_time_created(self, format_time=None):
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/TransientViewBatch.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import numpy as np
+from collections.abc import Sequence
+from ampel.base.PhotoColumns import to_column
+from ampel.base.ScienceRecord import ScienceRecord
+
+
+class TransientViewBatch(Sequence):
+	"""
+	Sequence of TransientView instances which can be passed as is to
+	:py:meth:`ampel.base.abstract.AbsT3Unit.AbsT3Unit.add`, and which provides
+	columnar projections across the batch: numpy arrays with one entry per transient,
+	aligned with the array tran_ids. Projections are memoized.
+	T3 units can then rank or threshold transients using numpy operations, for example:
+
+	.. sourcecode:: python
+
+		def add(self, transients):
+			if isinstance(transients, TransientViewBatch):
+				z, mask = transients.get_t2_values("SNCOSMO", "-1.output.fit_results.z")
+				selected = transients.select(mask & (z < 0.1))
+	"""
+
+	def __init__(self, views):
+		"""
+		:param views: iterable of TransientView instances
+		"""
+		self.views = tuple(views)
+		self.tran_ids = to_column([tv.tran_id for tv in self.views])[0]
+		self._cache = {}
+
+
+	def __len__(self):
+		return len(self.views)
+
+
+	def __iter__(self):
+		return iter(self.views)
+
+
+	def __getitem__(self, idx):
+		return self.views[idx]
+
+
+	def select(self, idx):
+		"""
+		:param idx: numpy bool mask or index array (ex: result of numpy.argsort)
+		:returns: new TransientViewBatch instance containing the selected views
+		"""
+		idx = np.asarray(idx)
+		if idx.dtype == bool:
+			idx = np.flatnonzero(idx)
+		return TransientViewBatch(self.views[i] for i in idx.tolist())
+
+
+	def get_values(self, func, key=None):
+		"""
+		Generic projection.
+		:param func: callable accepting a TransientView and returning a value (None: undefined)
+		:param key: optional hashable key under which the result is memoized
+		:returns: tuple (read-only numpy array, numpy bool mask), see PhotoColumns.to_column
+		"""
+		if key is not None and key in self._cache:
+			return self._cache[key]
+		ret = to_column([func(tv) for tv in self.views])
+		if key is not None:
+			self._cache[key] = ret
+		return ret
+
+
+	def get_t2_values(self, t2_unit_id, path):
+		"""
+		Values located at the provided path in the results of the latest science record
+		(see TransientView.get_science_records) of the provided T2 unit.
+		:param path: sequence of keys/indexes or string with keys/indexes separated by dots,
+		applied to ScienceRecord.results (ex: "-1.output.fit_results.z":
+		last result, key 'output', ...), see ScienceRecord.compile_path()
+		:returns: tuple (read-only numpy array, numpy bool mask flagging the transients
+		with a latest science record defining the path)
+		"""
+		path = path if isinstance(path, str) else tuple(path)
+		key = ('t2', t2_unit_id, path)
+		if key not in self._cache:
+			get = ScienceRecord.compile_path(path)
+			self._cache[key] = to_column([
+				get(sr.results) if sr is not None else None
+				for sr in self.get_latest_science_records(t2_unit_id)
+			])
+		return self._cache[key]
+
+
+	def get_latest_science_records(self, t2_unit_id):
+		"""
+		:returns: tuple containing, for each transient, the latest science record 
+		of the provided T2 unit or None (same semantic as 
+		TransientView.get_science_records(t2_unit_id, latest=True))
+		"""
+		key = ('t2records', t2_unit_id)
+		if key in self._cache:
+			return self._cache[key]
+
+		records = []
+		for tv in self.views:
+			# Direct scan, cheaper than building the index of each view for a single lookup
+			latest_state = tv.latest_state
+			rec = None
+			if latest_state is not None and tv.t2records:
+				for sr in tv.t2records:
+					if sr.t2_unit_id == t2_unit_id and sr.compound_id == latest_state:
+						rec = sr
+						break
+			records.append(rec)
+
+		self._cache[key] = records = tuple(records)
+		return records
+
+
+	def get_latest_pos(self, ret="brightest"):
+		"""
+		:param ret: see LightCurve.get_pos (modes returning a single position)
+		:returns: tuple (ra array, dec array, numpy bool mask flagging the transients
+		with a latest light curve containing matching photopoints)
+		"""
+		def func(tv):
+			lc = tv.get_latest_lightcurve() if tv.latest_state is not None and tv.lightcurves else None
+			return lc.get_pos(ret) if lc is not None else None
+
+		pos, mask = self.get_values(func, ('pos', ret))
+		ra = np.full(len(pos), np.nan)
+		dec = np.full(len(pos), np.nan)
+		if mask.any():
+			ra[mask], dec[mask] = np.array(pos[mask].tolist(), dtype=float).T
+		return ra, dec, mask
+
+
+	def get_photopoint_counts(self, latest=False, upper_limits=False):
+		"""
+		:param latest: if True, points of the latest light curve are counted,
+		otherwise all photopoints (or upper limits) of the transient
+		:returns: numpy int64 array
+		"""
+		if latest:
+			def func(tv):
+				lc = tv.get_latest_lightcurve() if tv.latest_state is not None and tv.lightcurves else None
+				if lc is None:
+					return 0
+				return len(lc.ulo_list if upper_limits else lc.ppo_list)
+		else:
+			def func(tv):
+				objs = tv.upperlimits if upper_limits else tv.photopoints
+				return len(objs) if objs is not None else 0
+
+		return self.get_values(func, ('count', latest, upper_limits))[0]
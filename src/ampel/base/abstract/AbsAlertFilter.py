@@ -4,13 +4,14 @@
 # License           : BSD-3-Clause
 # Author            : vb <vbrinnel@physik.hu-berlin.de>
 # Date              : 14.12.2017
-# Last Modified Date: 04.07.2018
+# Last Modified Date: 18.10.2026
 # Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
 
 from ampel.base.abstract.AmpelABC import AmpelABC, abstractmethod
 from ampel.base.AmpelAlert import AmpelAlert
+from ampel.base.AlertBatch import AlertBatch
 from logging import Logger
-from typing import Tuple, Set, Dict, Any, Optional
+from typing import Tuple, Set, Dict, Any, Optional, List
 
 class AbsAlertFilter(metaclass=AmpelABC):
 	"""
@@ -22,6 +23,12 @@ class AbsAlertFilter(metaclass=AmpelABC):
 	#: catalog database servers
 	resources : Tuple[str] = tuple()
 
+	#: Photopoint fields (ampel keywords such as 'mag' or alert keys such as 'rb')
+	#: read by this unit. Used to restrict alert decoding to the fields required
+	#: by the active filters (see :py:meth:`ampel.base.AvroAlertReader.AvroAlertReader.build_projection`).
+	#: None means that all fields might be used.
+	alert_fields : Optional[Tuple[str]] = None
+
 	@abstractmethod
 	def __init__(self, on_match_t2_units : Set[str],
 	    base_config : Optional[Dict[str,str]] = None,
@@ -48,6 +55,17 @@ class AbsAlertFilter(metaclass=AmpelABC):
 		"""
 		pass
 
+	def apply_batch(self, alert_batch : AlertBatch) -> List[Optional[Set[str]]]:
+		"""
+		Filter several candidates at once. The default implementation calls 
+		:py:meth:`apply` for each alert. Subclasses can override this method 
+		to evaluate their criteria on the columnar arrays of the batch.
+		
+		:param alert_batch: candidates to filter
+		:returns: one result per alert (see :py:meth:`apply`), in the order of the batch
+		"""
+		return [self.apply(ampel_alert) for ampel_alert in alert_batch]
+
 	# pylint: disable=no-member
 	def get_version(self):
 		return self.version
@@ -4,7 +4,7 @@
 # License           : BSD-3-Clause
 # Author            : vb <vbrinnel@physik.hu-berlin.de>
 # Date              : 23.02.2018
-# Last Modified Date: 15.10.2018
+# Last Modified Date: 18.10.2026
 # Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
 
 from ampel.base.abstract.AmpelABC import AmpelABC, abstractmethod
@@ -21,6 +21,10 @@ class AbsT3Unit(metaclass=AmpelABC):
 
 	@abstractmethod
 	def add(self, transients):
+		"""
+		:param transients: iterable of TransientView instances, possibly an instance of
+		:py:class:`ampel.base.TransientViewBatch.TransientViewBatch` providing columnar projections
+		"""
 		pass
 
 	@abstractmethod
@@ -4,9 +4,12 @@
 # License           : BSD-3-Clause
 # Author            : matteo giomi <matteo.giomi@desy.de>
 # Date              : 13.06.2018
-# Last Modified Date: 04.07.2018
+# Last Modified Date: 18.10.2026
 # Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
 
+import gzip
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from ampel.base.AmpelAlert import AmpelAlert
 
 class DevAmpelAlert(AmpelAlert):
@@ -16,36 +19,45 @@ class DevAmpelAlert(AmpelAlert):
 	"""
 
 	cutout_names = ('cutoutScience', 'cutoutTemplate', 'cutoutDifference')
+
+	__slots__ = ('cutout_dict', 'cutout_images')
 	
 	
 	@staticmethod
-	def load_from_avro_content(avro_content):
+	def load_from_avro_content(avro_content, columnar=False, pp_cache=None):
 		"""
 			return a DevAmpelAlert from a dictionary with the avro alert content.
+			pp_cache: optional PhotoPointCache instance (ignored in columnar mode)
 		"""
 		
-		# parse detections and upper limits
-		if avro_content.get('prv_candidates') is not None:
-			pps = [avro_content['candidate']]
-			pps.extend( 
-				[el for el in avro_content['prv_candidates'] if el.get('candid') is not None]
-					)
-			uls = [el for el in avro_content['prv_candidates'] if el.get('candid') is None]
+		# parse detections and upper limits (single pass, no intermediate copies)
+		pps = [avro_content['candidate']]
+		prv = avro_content.get('prv_candidates')
+		if prv is not None:
+			uls = []
+			for el in prv:
+				if el.get('candid') is None:
+					uls.append(el)
+				else:
+					pps.append(el)
 		else:
-			pps = [avro_content['candidate']]
 			uls = None
 		
 		# get image cutouts
 		co_dict = {}
 		for co_name in DevAmpelAlert.cutout_names:	#TODO: or classmethod?
-			co_dict[co_name] = avro_content.get(co_name, {}).get('stampData')
+			co = avro_content.get(co_name)
+			co_dict[co_name] = co.get('stampData') if co is not None else None
 		
+		if pp_cache is not None and not columnar:
+			pps = pp_cache.intern_all(pps)
+
 		# return the DevAmpelAlert
-		return DevAmpelAlert(avro_content['objectId'], pps, uls, co_dict)
+		return DevAmpelAlert(avro_content['objectId'], pps, uls, co_dict, columnar)
 
 
 
-	def __init__(self, tran_id, list_of_pps, list_of_uls=None, cutout_dict=None):
+	def __init__(self, tran_id, list_of_pps, list_of_uls=None, cutout_dict=None, columnar=False):
 		"""
 		DevAmpelAlert constructor.
 		
@@ -63,25 +75,66 @@ class DevAmpelAlert(AmpelAlert):
 		
 		cutout_dict:
 			dict with the three cutouts ('cutoutScience', 'cutoutTemplate', 'cutoutDifference')
-		"""
 		
-		AmpelAlert.__init__(self, tran_id, list_of_pps, list_of_uls)
+		columnar:
+			see AmpelAlert constructor
+		"""
 		
 		# add the cutouts if available
-		if cutout_dict is None:
-			cutout_dict = {}
-		else:
-			self.cutout_dict = cutout_dict
+		self.cutout_dict = cutout_dict if cutout_dict is not None else {}
+
+		# decoded cutout images (see get_cutout)
+		self.cutout_images = {}
+
+		# freezes this instance
+		AmpelAlert.__init__(self, tran_id, list_of_pps, list_of_uls, columnar)
 
 
-	def get_cutout(self, which):
+	def get_cutout(self, which, raw=False):
 		"""
-			return cutout staps for given image product
+			return the cutout image for given image product as a read-only 2D numpy array
+			(or None if the cutout is not available). Images are decompressed and decoded 
+			on first access and memoized.
+			raw: if True, return the cutout stamp as stored in the alert (gzipped FITS bytes)
 		"""
 		if which not in DevAmpelAlert.cutout_names:
 			raise KeyError("requested cutout for %s. Available are %s"%
 				(which, ", ".join(DevAmpelAlert.cutout_names)))
-		return self.cutout_dict.get(which)
+
+		if raw:
+			return self.cutout_dict.get(which)
+
+		img = self.cutout_images.get(which)
+		if img is None:
+			stamp = self.cutout_dict.get(which)
+			if stamp is None:
+				return None
+			img = decode_fits_image(stamp)
+			self.cutout_images[which] = img
+
+		return img
+
+
+	@staticmethod
+	def decode_cutouts(alerts, which=None, max_workers=None):
+		"""
+			decode the cutouts of many alerts using a thread pool 
+			(zlib releases the GIL while decompressing).
+			alerts: iterable of DevAmpelAlert instances
+			which: names of the cutouts to decode (default: all)
+			max_workers: see concurrent.futures.ThreadPoolExecutor
+			return a list of dicts (cutout name -> image), in the order of the provided alerts
+		"""
+		alerts = list(alerts)
+		names = DevAmpelAlert.cutout_names if which is None else tuple(which)
+
+		with ThreadPoolExecutor(max_workers=max_workers) as executor:
+			futures = [
+				{name: executor.submit(alert.get_cutout, name) for name in names}
+				for alert in alerts
+			]
+
+		return [{name: f.result() for name, f in d.items()} for d in futures]
 
 	def retrieve_cutouts_from_db(self, source):
 		"""
@@ -90,3 +143,50 @@ class DevAmpelAlert(AmpelAlert):
 		pass
 
 
+
+
+_fits_dtypes = {8: 'u1', 16: '>i2', 32: '>i4', 64: '>i8', -32: '>f4', -64: '>f8'}
+
+def decode_fits_image(stamp):
+	"""
+	Minimal decoder for the (optionally gzipped) single HDU FITS images contained in alerts.
+	The returned array is a read-only view on the decompressed buffer
+	(unless BSCALE/BZERO require a rescaling).
+	:param stamp: bytes-like object
+	:returns: numpy array with shape (NAXIS2, NAXIS1)
+	"""
+	buf = memoryview(stamp)
+	if buf[:2] == b'\x1f\x8b':
+		buf = memoryview(gzip.decompress(buf))
+
+	header = {}
+	offset = 0
+	while True:
+		block = bytes(buf[offset:offset + 2880])
+		if len(block) < 2880:
+			raise ValueError("Truncated FITS header")
+		offset += 2880
+		for i in range(0, 2880, 80):
+			card = block[i:i+80].decode('ascii')
+			key = card[:8].strip()
+			if key == 'END':
+				break
+			if card[8:10] == '= ':
+				header[key] = card[10:].split('/')[0].strip()
+		else:
+			continue
+		break
+
+	shape = tuple(int(header['NAXIS%i' % i]) for i in range(int(header['NAXIS']), 0, -1))
+	img = np.frombuffer(
+		buf, dtype=_fits_dtypes[int(header['BITPIX'])],
+		count=int(np.prod(shape)), offset=offset
+	).reshape(shape)
+
+	bscale = float(header.get('BSCALE', 1))
+	bzero = float(header.get('BZERO', 0))
+	if bscale != 1 or bzero != 0:
+		img = img * bscale + bzero
+		img.flags.writeable = False
+
+	return img
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/base/dev/InMemoryTransientStore.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+from ampel.base.LazyTransientView import LazyTransientView
+
+
+class InMemoryTransientStore:
+	"""
+	In-memory stand-in for the database backed loaders of 
+	:py:class:`ampel.base.LazyTransientView.LazyTransientView` instances
+	(for tests and notebooks). Calls to the loaders are counted per component.
+
+	Example:
+
+	.. sourcecode:: python
+
+		store = InMemoryTransientStore()
+		store.add(tran_id, t2records=[...], journal=[...])
+		tv = store.get_view(tran_id, latest_state=latest_state)
+	"""
+
+	def __init__(self):
+		self.transients = {}
+		self.calls = {}
+
+
+	def add(self, tran_id, **components):
+		"""
+		:param components: see LazyTransientView.components
+		"""
+		self.transients.setdefault(tran_id, {}).update(components)
+
+
+	def get_loader(self, name):
+		"""
+		:returns: callable accepting a transient id and returning the provided component 
+		(None if the component was not added for this transient)
+		"""
+		def load(tran_id):
+			self.calls[name] = self.calls.get(name, 0) + 1
+			return self.transients.get(tran_id, {}).get(name)
+		return load
+
+
+	def get_loaders(self, names=None):
+		"""
+		:param names: component names (default: LazyTransientView.components)
+		:returns: dict: component name -> loader
+		"""
+		return {
+			name: self.get_loader(name) 
+			for name in (names if names is not None else LazyTransientView.components)
+		}
+
+
+	def get_view(self, tran_id, flags=None, latest_state=None, preload=(), **kwargs):
+		"""
+		:param preload: names of the components to load right away
+		:param kwargs: other parameters of the LazyTransientView constructor
+		:returns: LazyTransientView instance
+		"""
+		tv = LazyTransientView(
+			tran_id, flags, self.get_loaders(), latest_state=latest_state, **kwargs
+		)
+		if preload:
+			tv.preload(*preload)
+		return tv
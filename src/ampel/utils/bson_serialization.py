@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/utils/bson_serialization.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+"""
+Binary counterpart of :py:mod:`ampel.utils.json_serialization` based on BSON.
+Ampel types are encoded using the same class hints as AmpelEncoder
+({"__jsonclass__": [class name, *params], **attrs}) and decoded using the same
+class registry (see json_serialization.register_class()), so that
+loads(dumps(obj)) returns what json_serialization would return for obj.
+BSON types (Binary, ObjectId, datetime, ...) and floats are stored natively
+rather than as text. Class names are stored once per document: class hints
+reference them by index ({"__jsonclass__": [index, *params], **attrs}).
+
+Limitations: integers must fit into 64 bits, dict keys are converted to str
+like in JSON (skipkeys is not supported).
+"""
+
+import bson
+from bson.binary import STANDARD
+from bson.codec_options import CodecOptions
+from bson.int64 import Int64
+from ampel.utils.json_serialization import AmpelEncoder, get_class, json_options, \
+	_NATIVE, _SERIALIZE, _ITEMS, _LIST, _native_types
+
+# Datetimes are decoded like in the JSON path
+codec_options = CodecOptions(
+	tz_aware=json_options.tz_aware,
+	tzinfo=json_options.tzinfo,
+	uuid_representation=STANDARD
+)
+
+
+def dumps(obj, lossy=False):
+	"""
+	:param lossy: see AmpelEncoder
+	:returns: bytes
+	:raises bson.errors.InvalidDocument: if obj contains types unknown to both AmpelEncoder and BSON
+	"""
+	return AmpelBsonEncoder(lossy=lossy).to_bson(obj)
+
+
+def loads(data):
+	"""
+	Deserialize an object serialized by dumps()
+	"""
+	return _decode_root(bson.decode(data, codec_options))
+
+
+def dump(objs, fileobj, lossy=False):
+	"""
+	Write objects to the binary file object fileobj (sequence of BSON documents)
+	"""
+	encoder = AmpelBsonEncoder(lossy=lossy)
+	for obj in objs:
+		fileobj.write(encoder.to_bson(obj))
+
+
+def load(fileobj):
+	"""
+	Generator of the objects written to fileobj by dump()
+	"""
+	for doc in bson.decode_file_iter(fileobj, codec_options):
+		yield _decode_root(doc)
+
+
+def _decode_root(root):
+	""" """
+	classes = [get_class(name) for name in root['classes']]
+	return _decode({'obj': root['obj']}, classes)['obj']
+
+
+def _decode(doc, classes):
+	"""
+	Instantiates (in place, bottom-up) the class-hinted documents contained in doc
+	"""
+	for k, v in doc.items():
+		t = type(v)
+		if t is dict:
+			doc[k] = _decode(v, classes)
+		elif t is list:
+			_decode_list(v, classes)
+		elif t is Int64:
+			doc[k] = int(v)
+
+	if "__jsonclass__" in doc:
+		ctor = doc.pop("__jsonclass__")
+		return classes[ctor[0]](*ctor[1:], **doc)
+
+	return doc
+
+
+def _decode_list(seq, classes):
+	""" """
+	for i, v in enumerate(seq):
+		t = type(v)
+		if t is dict:
+			seq[i] = _decode(v, classes)
+		elif t is list:
+			_decode_list(v, classes)
+		elif t is Int64:
+			seq[i] = int(v)
+
+
+class AmpelBsonEncoder(AmpelEncoder):
+	"""
+	Builds BSON-encodable documents equivalent to the output of AmpelEncoder:
+	same class hints (class names being replaced by indexes, see to_bson())
+	and JSON conversions (tuples outside of serialized objects and IntFlags
+	in plain containers become lists and ints, dict keys str),
+	BSON types being kept as is.
+	"""
+
+	def __init__(self, *args, **kwargs):
+		AmpelEncoder.__init__(self, *args, **kwargs)
+		# class name -> index, see to_bson()
+		self._class_index = {}
+
+
+	def to_bson(self, obj):
+		"""
+		:returns: BSON document {'classes': [class names], 'obj': to_document(obj)} as bytes
+		"""
+		self._class_index = {}
+		doc = self.to_document(obj)
+		return bson.encode(
+			{'classes': list(self._class_index), 'obj': doc}, codec_options=codec_options
+		)
+
+
+	def to_document(self, obj):
+		"""
+		Counterpart of json.JSONEncoder.encode(obj)
+		"""
+		t = type(obj)
+		if t in _native_types:
+			return obj
+		elif isinstance(obj, dict):
+			return {self._key(k): self.to_document(v) for k, v in obj.items()}
+		elif isinstance(obj, (list, tuple)):
+			return [self.to_document(el) for el in obj]
+		elif isinstance(obj, str):
+			return str.__str__(obj)
+		elif isinstance(obj, int):
+			return int(obj)
+		elif isinstance(obj, float):
+			return float(obj)
+		return self._encode(obj)
+
+
+	def _encode(self, obj):
+		"""
+		Counterpart of AmpelEncoder.default(obj, fallthrough=True)
+		"""
+		handler = self._type_handlers.get(type(obj)) or self._get_handler(type(obj))
+		kind = handler[0]
+		if kind is _NATIVE:
+			return obj
+		enc = self._encode
+		if kind is _SERIALIZE:
+			params, attrs = self._split(handler[2](obj))
+			idx = self._class_index.setdefault(handler[1], len(self._class_index))
+			return {"__jsonclass__": [idx] + enc(params), **enc(attrs)}
+		elif kind is _ITEMS:
+			return {
+				k if type(k) is str else self._key(enc(k)): v if type(v) in _native_types else enc(v)
+				for k, v in obj.items()
+			}
+		elif kind is _LIST:
+			return [el if type(el) in _native_types else enc(el) for el in obj]
+		else:
+			# BSON type, or subclass of a JSON type
+			return self.to_document(obj) if isinstance(obj, (str, int, float)) else obj
+
+
+	def _key(self, k):
+		"""
+		Dict key converted to str like json does
+		"""
+		if isinstance(k, str):
+			return str.__str__(k)
+		elif isinstance(k, (int, float)) or k is None:
+			return self._scalar(k)
+		raise TypeError(f'keys must be str, int, float, bool or None, not {k.__class__.__name__}')
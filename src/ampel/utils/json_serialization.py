@@ -1,104 +1,358 @@
-
 import inspect
 import json
 import bson.json_util
+from bson.binary import PYTHON_LEGACY
+from json.encoder import encode_basestring, encode_basestring_ascii
 from importlib import import_module
 from enum import IntFlag
 from types import MappingProxyType
 
+# Settings of bson.json_util.STRICT_JSON_OPTIONS (removed in pymongo 4)
+json_options = bson.json_util.JSONOptions(
+	json_mode=bson.json_util.JSONMode.LEGACY, strict_number_long=True,
+	datetime_representation=bson.json_util.DatetimeRepresentation.ISO8601,
+	strict_uuid=True, uuid_representation=PYTHON_LEGACY, tz_aware=True
+)
+
 def load(fileobj):
 	for line in fileobj:
 		yield json.loads(line, object_hook=object_hook)
 
+def dump(objs, fileobj, lossy=False, **kwargs):
+	"""
+	Write objects to fileobj in the format read by load() (one JSON document per line).
+	Documents are streamed, see AmpelEncoder.iterencode()
+	"""
+	encoder = AmpelEncoder(lossy=lossy, **kwargs)
+	write = fileobj.write
+	for obj in objs:
+		for chunk in encoder.iterencode(obj):
+			write(chunk)
+		write('\n')
+
+# Kinds of type handlers (see AmpelEncoder._get_handler)
+_NATIVE, _SERIALIZE, _ITEMS, _LIST, _BSON = range(5)
+_native_types = frozenset((str, int, float, bool, type(None)))
+
 class AmpelEncoder(json.JSONEncoder):
 	"""
 	Serialize objects in a mix of:
 	a) JSONRPC 1.0-like class hinting for custom Ampel types
 	b) PyMongo-provided JSON representation for BSON types
+
+	The encoding of an object depends only on its type: the corresponding
+	handler (serializer and class hint) is resolved once per type and cached.
 	"""
+
+	#: JSON nesting level from which iterencode() encodes sub-documents at once
+	stream_depth = 3
+
+	# lossy -> {type: (kind, json_class, serializer)}
+	_handlers = {False: {}, True: {}}
+
 	def __init__(self, *args, lossy=False, **kwargs):
 		"""
 		if lossy, cast mappingproxy to dict, set and tuple to list, etc
 		"""
 		self.lossy = lossy
 		json.JSONEncoder.__init__(self, *args, **kwargs)
-		self.bson_options = bson.json_util.STRICT_JSON_OPTIONS
+		self.bson_options = json_options
+		self._type_handlers = AmpelEncoder._handlers[bool(lossy)]
 
 	def default(self, obj, fallthrough=False):
 		"""
 		Encode selected types in jsonrpc class-hint notation
 		"""
-		serializer = self.get_serializer(obj)
-		if serializer is not None:
-			if obj.__class__.__module__ == "builtins":
-				module_name = "builtins"
-			else:
-				module_name = inspect.getmodule(obj).__name__
-			json_class = obj.__class__.__name__
-			if module_name not in ['', '__main__']:
-				json_class = '%s.%s' % (module_name, json_class)
-			# mappingproxy lies about its type
-			if type(obj) == MappingProxyType:
-				json_class = 'types.MappingProxyType'
-			rep = serializer(obj)
-			if isinstance(rep, tuple):
-				assert len(rep) == 2
-				params, attrs = rep
-			elif isinstance(rep, dict):
-				params, attrs = [], rep
-			else:
-				params, attrs = rep, {}
-			return {"__jsonclass__": [json_class] + self.default(params, True), **self.default(attrs, True)}
-		elif hasattr(obj, 'items'):
-			return {self.default(k, True): self.default(v, True) for k,v in obj.items()}
-		elif isinstance(obj, list) or isinstance(obj, set) or isinstance(obj, tuple):
-			return [self.default(k, True) for k in obj]
-		else:
+		if not fallthrough and self._get_handler(type(obj))[0] in (_NATIVE, _BSON):
 			# convert remaining Mongo types
+			return bson.json_util.default(obj, self.bson_options)
+		return self._encode(obj)
+
+	def _encode(self, obj):
+		"""
+		Same as default(obj, fallthrough=True)
+		"""
+		handler = self._type_handlers.get(type(obj)) or self._get_handler(type(obj))
+		kind = handler[0]
+		if kind is _NATIVE:
+			return obj
+		enc = self._encode
+		if kind is _SERIALIZE:
+			params, attrs = self._split(handler[2](obj))
+			return {"__jsonclass__": [handler[1]] + enc(params), **enc(attrs)}
+		elif kind is _ITEMS:
+			return {
+				k if type(k) is str else enc(k): v if type(v) in _native_types else enc(v)
+				for k, v in obj.items()
+			}
+		elif kind is _LIST:
+			return [el if type(el) in _native_types else enc(el) for el in obj]
+		else:
 			try:
 				return bson.json_util.default(obj, self.bson_options)
 			except TypeError:
-				if fallthrough:
-					return obj
-				else:
-					raise
+				return obj
+
+	@staticmethod
+	def _split(rep):
+		"""
+		:returns: tuple (params, attrs) of a serializer output
+		"""
+		if isinstance(rep, tuple):
+			assert len(rep) == 2
+			return rep
+		elif isinstance(rep, dict):
+			return [], rep
+		else:
+			return rep, {}
+
+	def _get_handler(self, klass):
+		"""
+		:returns: tuple (kind, json_class, serializer) for instances of klass
+		"""
+		handler = self._type_handlers.get(klass)
+		if handler is not None:
+			return handler
+		serializer = self._get_type_serializer(klass)
+		if serializer is not None:
+			handler = (_SERIALIZE, self._get_json_class(klass), serializer)
+		elif klass in _native_types:
+			handler = (_NATIVE, None, None)
+		elif hasattr(klass, 'items'):
+			handler = (_ITEMS, None, None)
+		elif issubclass(klass, (list, set, tuple)):
+			handler = (_LIST, None, None)
+		else:
+			handler = (_BSON, None, None)
+		self._type_handlers[klass] = handler
+		return handler
+
+	@staticmethod
+	def _get_json_class(klass):
+		"""
+		Class hint of the instances of klass. Classes can define the class attribute
+		'serialize_as' to be serialized under the name of another (parent) class.
+		"""
+		klass = getattr(klass, 'serialize_as', klass)
+		# mappingproxy lies about its type
+		if klass is MappingProxyType:
+			return 'types.MappingProxyType'
+		if klass.__module__ == "builtins":
+			module_name = "builtins"
+		else:
+			module_name = inspect.getmodule(klass).__name__
+		json_class = klass.__name__
+		if module_name not in ['', '__main__']:
+			json_class = '%s.%s' % (module_name, json_class)
+		return json_class
 
 	def get_serializer(self, obj):
 		"""
 		Serializers for types we want to preserve
 		"""
-		if hasattr(obj, 'serialize'):
-			return type(obj).serialize
-		elif hasattr(obj, '__dataclass_fields__'):
+		return self._get_handler(type(obj))[2]
+
+	def _get_type_serializer(self, klass):
+		""" """
+		if hasattr(klass, 'serialize'):
+			return klass.serialize
+		elif hasattr(klass, '__dataclass_fields__'):
 			return lambda x: x.__dict__
-		elif isinstance(obj, IntFlag):
+		elif issubclass(klass, IntFlag):
 			return lambda x: [int(x)]
 		elif self.lossy:
 			return None
 
 		# try to preserve types
-		if isinstance(obj, set) or isinstance(obj, tuple):
+		if issubclass(klass, (set, tuple)):
 			return lambda x: [list(x)]
-		elif isinstance(obj, MappingProxyType):
-			return lambda x: [dict(obj)]
+		elif issubclass(klass, MappingProxyType):
+			return lambda x: [dict(x)]
 		else:
 			return None
 
-def object_hook(dct, options=bson.json_util.STRICT_JSON_OPTIONS):
+	def iterencode(self, o, _one_shot=False):
+		"""
+		Streaming encoding (used by json.dump() and dump()), yielding the same 
+		output as json.JSONEncoder.iterencode without building the class-hinted 
+		representation of o first. Sub-documents nested deeper than stream_depth
+		are encoded at once. Falls back to json.JSONEncoder.iterencode 
+		if indent or sort_keys is set, or when called by encode() (json.dumps).
+		"""
+		if _one_shot or self.indent is not None or self.sort_keys:
+			return json.JSONEncoder.iterencode(self, o, _one_shot)
+		return self._iter_native(o, 0)
+
+	def _iter_native(self, o, level):
+		"""
+		Yields the chunks json.JSONEncoder would produce for o
+		"""
+		if type(o) in _native_types:
+			yield self._scalar(o)
+		elif isinstance(o, (list, tuple, dict)):
+			if level >= self.stream_depth:
+				yield from json.JSONEncoder.iterencode(self, o, True)
+			elif isinstance(o, dict):
+				yield from self._iter_dict(o.items(), self._key, self._iter_native, level)
+			else:
+				yield from self._iter_list(o, self._iter_native, level)
+		elif isinstance(o, (str, int, float)):
+			yield self._scalar(o)
+		else:
+			yield from self._iter_default(o, level, False)
+
+	def _iter_default(self, o, level, fallthrough=True):
+		"""
+		Yields the chunks encoding default(o, fallthrough)
+		"""
+		kind, json_class, serializer = self._get_handler(type(o))
+		if kind is _NATIVE and fallthrough:
+			yield self._scalar(o)
+		elif kind is _BSON or kind is _NATIVE or level >= self.stream_depth:
+			yield from json.JSONEncoder.iterencode(self, self.default(o, fallthrough), True)
+		elif kind is _SERIALIZE:
+			params, attrs = self._split(serializer(o))
+			yield '{"__jsonclass__"' + self.key_separator + '[' + self._scalar(json_class)
+			for el in params:
+				yield self.item_separator
+				yield from self._iter_default(el, level + 2)
+			yield ']'
+			for k, v in attrs.items():
+				k = self._key(self._encode(k))
+				if k is not None:
+					yield self.item_separator + k + self.key_separator
+					yield from self._iter_default(v, level + 1)
+			yield '}'
+		elif kind is _ITEMS:
+			yield from self._iter_dict(
+				o.items(), lambda k: self._key(self._encode(k)), self._iter_default, level
+			)
+		else:
+			yield from self._iter_list(o, self._iter_default, level)
+
+	def _iter_list(self, seq, iter_el, level):
+		""" """
+		first = True
+		yield '['
+		for el in seq:
+			if first:
+				first = False
+			else:
+				yield self.item_separator
+			yield from iter_el(el, level + 1)
+		yield ']'
+
+	def _iter_dict(self, items, key, iter_val, level):
+		""" """
+		first = True
+		yield '{'
+		for k, v in items:
+			k = key(k)
+			if k is None:
+				continue
+			if first:
+				first = False
+				yield k + self.key_separator
+			else:
+				yield self.item_separator + k + self.key_separator
+			yield from iter_val(v, level + 1)
+		yield '}'
+
+	def _scalar(self, o):
+		"""
+		JSON representation of str, int, float, bool and None values
+		"""
+		if isinstance(o, str):
+			return encode_basestring_ascii(o) if self.ensure_ascii else encode_basestring(o)
+		elif o is None:
+			return 'null'
+		elif o is True:
+			return 'true'
+		elif o is False:
+			return 'false'
+		elif isinstance(o, int):
+			return int.__repr__(o)
+		elif o != o:
+			text = 'NaN'
+		elif o == float('inf'):
+			text = 'Infinity'
+		elif o == -float('inf'):
+			text = '-Infinity'
+		else:
+			return float.__repr__(o)
+		if not self.allow_nan:
+			raise ValueError("Out of range float values are not JSON compliant: " + repr(o))
+		return text
+
+	def _key(self, k):
+		"""
+		JSON representation of a dict key (None: key to be skipped)
+		"""
+		if isinstance(k, str):
+			return self._scalar(k)
+		elif isinstance(k, (int, float)) or k is None:
+			return self._scalar(self._scalar(k))
+		elif self.skipkeys:
+			return None
+		raise TypeError(f'keys must be str, int, float, bool or None, not {k.__class__.__name__}')
+
+#: Class hints object_hook() is allowed to decode (see register_class()),
+#: mapped to the corresponding class once it was imported (None beforehand)
+decodable_classes = dict.fromkeys([
+	'builtins.set',
+	'builtins.tuple',
+	'types.MappingProxyType',
+	'ampel.base.Compound.Compound',
+	'ampel.base.LightCurve.LightCurve',
+	'ampel.base.PlainPhotoPoint.PlainPhotoPoint',
+	'ampel.base.PlainUpperLimit.PlainUpperLimit',
+	'ampel.base.ScienceRecord.ScienceRecord',
+	'ampel.base.TransientView.TransientView',
+	'ampel.base.dataclass.GlobalInfo.GlobalInfo',
+	'ampel.base.dataclass.JournalUpdate.JournalUpdate',
+	'ampel.base.flags.AmpelFlags.AmpelFlags',
+	'ampel.base.flags.PhotoFlags.PhotoFlags',
+	'ampel.base.flags.TransientFlags.TransientFlags'
+])
+
+def register_class(klass):
+	"""
+	Allow object_hook() to decode instances of klass
+	"""
+	decodable_classes[AmpelEncoder._get_json_class(klass)] = klass
+
+def get_class(json_class):
+	"""
+	:param json_class: class hint, ex: 'ampel.base.LightCurve.LightCurve'
+	:raises ValueError: if the class was not registered as decodable
+	"""
+	klass = decodable_classes.get(json_class)
+	if klass is not None:
+		return klass
+	if json_class not in decodable_classes:
+		raise ValueError(
+			"Class %s is not decodable, see json_serialization.register_class()" % json_class
+		)
+	module_name, _, class_name = json_class.rpartition('.')
+	klass = getattr(import_module(module_name), class_name)
+	decodable_classes[json_class] = klass
+	return klass
+
+def object_hook(dct, options=json_options):
 	"""
 	Deserialize an object serialized by AmpelEncoder
 	"""
-	obj = bson.json_util.object_hook(dct, options)
-	if type(obj) != type(dct):
-		return obj
-	elif "__jsonclass__" in dct:
+	# Extended JSON representations of BSON types have '$'-prefixed keys.
+	# Joining the keys is cheaper than testing each of them 
+	# (false positives only cost a call to the bson hook)
+	if '$' in ''.join(dct):
+		obj = bson.json_util.object_hook(dct, options)
+		if type(obj) != type(dct):
+			return obj
+	if "__jsonclass__" in dct:
 		ctor = dct.pop("__jsonclass__")
-		parts = ctor[0].split('.')
-		mod = import_module('.'.join(parts[:-1]))
-		klass = getattr(mod, parts[-1])
 		# Here we treat the jsonrpc-style attrs as keyword args. This does not
 		# necessarily conform to the 1.0 spec, but it's deprecated anyhow.
-		obj = klass(*ctor[1:], **dct)
-		return obj
+		return get_class(ctor[0])(*ctor[1:], **dct)
 	else:
 		return dct
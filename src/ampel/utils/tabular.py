@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : ampel/utils/tabular.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+"""
+Export of columnar photometric data (dicts: field name -> (numpy array, numpy bool mask),
+see :py:func:`ampel.base.PhotoColumns.to_column`) to pyarrow tables and pandas DataFrames.
+Numeric value buffers are handed over without copy whenever the target library allows it.
+pyarrow and pandas are optional dependencies, imported on first use.
+
+Used by the methods to_arrow() and to_pandas() of LightCurve, AmpelAlert and TransientView.
+Light curves of several transients can be concatenated into one table using
+concat_to_arrow() / concat_to_pandas(), which add a 'tran_id' column.
+"""
+
+from ampel.base.PhotoColumns import to_column, concat_columns
+
+# module name -> setup.py extras_require key
+_extras = {'pyarrow': 'arrow', 'pandas': 'pandas'}
+
+
+def _import(name):
+	""" """
+	try:
+		return __import__(name)
+	except ImportError:
+		raise ImportError(
+			"Optional dependency '%s' is required for this export "
+			"(pip install %s, or pip install ampel-base[%s])" % (name, name, _extras[name])
+		) from None
+
+
+def columns_to_arrow(columns):
+	"""
+	:param columns: dict: field name -> tuple (numpy array, numpy bool mask)
+	:returns: pyarrow.Table, undefined entries being null
+	"""
+	pa = _import('pyarrow')
+	return pa.table({
+		k: pa.array(arr, mask=None if mask.all() else ~mask)
+		for k, (arr, mask) in columns.items()
+	})
+
+
+def columns_to_pandas(columns):
+	"""
+	:param columns: dict: field name -> tuple (numpy array, numpy bool mask)
+	:returns: pandas.DataFrame. Int and bool columns with undefined entries
+	use pandas nullable extension arrays, float columns NaN values.
+	"""
+	pd = _import('pandas')
+	data = {}
+	for k, (arr, mask) in columns.items():
+		if mask.all() or arr.dtype.kind in 'fO':
+			data[k] = arr
+		elif arr.dtype.kind == 'i':
+			data[k] = pd.arrays.IntegerArray(arr, ~mask)
+		else:
+			data[k] = pd.arrays.BooleanArray(arr, ~mask)
+	return pd.DataFrame(data, copy=False)
+
+
+def concat_columns_of(objs, fields=None, upper_limits=False, tran_ids=None):
+	"""
+	:param objs: iterable of LightCurve, AmpelAlert and/or TransientView instances
+	:param fields: list of field names (default: all fields of all objects)
+	:param upper_limits: if True, upper limits are exported instead of photopoints
+	:param tran_ids: transient ids associated with objs (required for LightCurve instances,
+	default: attribute 'tran_id' of the objects)
+	:returns: dict: field name -> tuple (numpy array, numpy bool mask) with a leading 'tran_id' column
+	"""
+	objs = list(objs)
+	if tran_ids is None:
+		tran_ids = [obj.tran_id for obj in objs]
+
+	parts = [obj.get_columns(fields, upper_limits) for obj in objs]
+	lengths = [len(next(iter(p.values()))[0]) if p else 0 for p in parts]
+
+	if fields is None:
+		fields = list(dict.fromkeys(k for p in parts for k in p))
+
+	ids, mask = to_column(list(tran_ids))
+	columns = {'tran_id': (ids.repeat(lengths), mask.repeat(lengths))}
+
+	for field in fields:
+		columns[field] = concat_columns([
+			p[field] if field in p else to_column([None] * length)
+			for p, length in zip(parts, lengths)
+		]) if parts else to_column([])
+
+	return columns
+
+
+def concat_to_arrow(objs, fields=None, upper_limits=False, tran_ids=None):
+	"""
+	Single pyarrow.Table for several transients, see concat_columns_of()
+	"""
+	return columns_to_arrow(concat_columns_of(objs, fields, upper_limits, tran_ids))
+
+
+def concat_to_pandas(objs, fields=None, upper_limits=False, tran_ids=None):
+	"""
+	Single pandas.DataFrame for several transients, see concat_columns_of()
+	"""
+	return columns_to_pandas(concat_columns_of(objs, fields, upper_limits, tran_ids))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : tests/conftest.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import os, sys
+from types import MappingProxyType
+import pytest
+
+# Run the tests against the source tree (no installation required)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from ampel.base.AmpelAlert import AmpelAlert
+from ampel.base.flags.AmpelFlags import AmpelFlags
+
+
+@pytest.fixture(scope="session", autouse=True)
+def alert_keywords():
+	""" ZTF-like class settings of AmpelAlert """
+	AmpelAlert.set_alert_keywords(
+		{"obs_date": "jd", "mag": "magpsf", "photopoint_id": "candid", "filter_id": "fid"}
+	)
+	AmpelAlert.set_class_flags(AmpelFlags.INST_ZTF | AmpelFlags.SRC_IPAC)
+
+
+@pytest.fixture
+def alerts():
+	""" 30 alerts with 3 photopoints each """
+	return [
+		AmpelAlert(
+			i, tuple(
+				MappingProxyType({'candid': i * 10 + k, 'jd': float(k), 'magpsf': 17. + (i % 3) + k / 10, 'fid': 1})
+				for k in range(3)
+			)
+		)
+		for i in range(30)
+	]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : tests/test_AvroAlertReader.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import io
+import fastavro
+import pytest
+from ampel.base.AvroAlertReader import AvroAlertReader, _header_schema
+
+schema = fastavro.parse_schema({
+	'type': 'record', 'name': 'point',
+	'fields': [{'name': 'candid', 'type': 'long'}, {'name': 'magpsf', 'type': 'double'}]
+})
+records = [{'candid': i, 'magpsf': 18. + i / 10} for i in range(50)]
+
+
+def write(codec):
+	fo = io.BytesIO()
+	fastavro.writer(fo, schema, records, codec=codec, sync_interval=200)
+	return fo.getvalue()
+
+
+@pytest.mark.parametrize("codec", ["null", "deflate"])
+def test_read(codec):
+	assert list(AvroAlertReader(io.BytesIO(write(codec))).iter_records()) == records
+
+
+@pytest.mark.parametrize("codec", ["null", "deflate"])
+def test_truncated(codec):
+	data = write(codec)
+	fo = io.BytesIO(data)
+	sync = fastavro.schemaless_reader(fo, _header_schema)['sync']
+	header_size = fo.tell()
+	for length in range(1, header_size):
+		with pytest.raises(ValueError, match="header|magic"):
+			list(AvroAlertReader(io.BytesIO(data[:length])).iter_records())
+	for length in range(header_size + 1, len(data)):
+		if data[length - len(sync):length] == sync:
+			# truncation at a block boundary results in a valid container
+			continue
+		with pytest.raises(ValueError, match="block"):
+			list(AvroAlertReader(io.BytesIO(data[:length])).iter_records())
+
+
+def test_corrupt_sync():
+	data = bytearray(write("null"))
+	data[-1] ^= 0xFF
+	with pytest.raises(ValueError, match="sync marker"):
+		list(AvroAlertReader(io.BytesIO(bytes(data))).iter_records())
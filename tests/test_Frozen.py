@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : tests/test_Frozen.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import pickle
+import pytest
+from ampel.base.Frozen import Frozen
+
+
+class Point(Frozen):
+	__slots__ = ('x', )
+
+	def __init__(self, x):
+		self.x = x
+		self._freeze()
+
+
+class LegacyPoint(Frozen):
+	__slots__ = ('x', '__dict__')
+
+	def __init__(self, x, freeze=True):
+		self.x = x
+		self.__isfrozen = freeze
+
+
+class LegacySubPoint(LegacyPoint):
+	pass
+
+
+def test_freeze():
+	p = Point(1)
+	with pytest.raises(TypeError):
+		p.x = 2
+	with pytest.raises(TypeError):
+		del p.x
+	assert pickle.loads(pickle.dumps(p)).x == 1
+
+
+@pytest.mark.parametrize("klass", [LegacyPoint, LegacySubPoint])
+def test_legacy_idiom(klass):
+	with pytest.raises(TypeError):
+		klass(1).x = 2
+	p = klass(1, freeze=False)
+	p.x = 2
+	assert p.x == 2
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : tests/test_LightCurve.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import pytest
+from ampel.base.LightCurve import LightCurve
+from ampel.base.PlainPhotoPoint import PlainPhotoPoint
+from ampel.base.flags.PhotoFlags import PhotoFlags
+
+pps = [
+	{'_id': 1, 'candid': 1, 'jd': 1., 'magpsf': 18., 'fid': 3, 'ra': 10., 'dec': 20., 'sigmapsf': 0.1},
+	{'_id': 2, 'candid': 2, 'jd': 2., 'magpsf': 17., 'fid': 3, 'ra': 10.2, 'dec': 20.2, 'sigmapsf': 0.2},
+]
+
+filters = [
+	{'attribute': 'fid', 'operator': '==', 'value': 3},
+	{'attribute': 'fid', 'operator': '==', 'value': (3, 3)},
+	{'attribute': 'fid', 'operator': '!=', 'value': (3, 3, 3)},
+	{'attribute': 'magpsf', 'operator': '==', 'value': [18., 17.]},
+]
+
+
+def get_lcs():
+	flags = PhotoFlags.INST_ZTF | PhotoFlags.SRC_IPAC
+	return [
+		LightCurve(b'c1', [PlainPhotoPoint(d, flags) for d in pps], read_only=read_only)
+		for read_only in (True, False)
+	]
+
+
+@pytest.mark.parametrize("filter_spec", filters)
+def test_filter_equivalence(filter_spec):
+	lc, rw_lc = get_lcs()
+	assert lc.get_values('jd', filters=filter_spec) == rw_lc.get_values('jd', filters=filter_spec)
+	assert lc.get_tuples('jd', 'magpsf', filters=filter_spec) == \
+		rw_lc.get_tuples('jd', 'magpsf', filters=filter_spec)
+
+
+@pytest.mark.parametrize("filter_spec", filters)
+@pytest.mark.parametrize("ret", ["raw", "mean", "brightest", "latest"])
+def test_get_pos_filters(filter_spec, ret):
+	lc, rw_lc = get_lcs()
+	assert lc.get_pos(ret, filter_spec) == rw_lc.get_pos(ret, filter_spec)
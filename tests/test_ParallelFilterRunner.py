@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : tests/test_ParallelFilterRunner.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import logging
+from ampel.base.ParallelFilterRunner import ParallelFilterRunner
+from ampel.base.abstract.AbsAlertFilter import AbsAlertFilter
+
+
+class MagFilter(AbsAlertFilter):
+	""" Accepts alerts brighter than run_config['max_mag'] """
+
+	def __init__(self, on_match_t2_units, base_config=None, run_config=None, logger=None):
+		self.on_match_t2_units = on_match_t2_units
+		self.max_mag = run_config['max_mag']
+
+	def apply(self, alert):
+		return self.on_match_t2_units if min(alert.get_values('mag')) < self.max_mag else None
+
+
+def get_runner(**kwargs):
+	return ParallelFilterRunner(
+		[(MagFilter, {'T2'}, None, {'max_mag': 18.})], processes=2, chunk_size=7, **kwargs
+	)
+
+
+def test_run_matches_serial(alerts):
+	with get_runner() as runner:
+		assert list(runner.run(alerts)) == list(runner.run_serial(alerts))
+		assert runner.check(alerts) is None
+
+
+def test_stats(alerts, caplog):
+	logger = logging.getLogger('test_stats')
+	with get_runner(logger=logger) as runner:
+		with caplog.at_level(logging.INFO, logger='test_stats'):
+			assert len(list(runner.run(alerts))) == len(alerts)
+		stats = runner.get_stats()
+	assert stats['alerts'] == len(alerts)
+	assert stats['chunks'] == 5
+	assert stats['alerts_per_sec'] == runner.get_throughput() > 0
+	assert "30 alerts (5 chunks)" in caplog.text
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : tests/test_PhotoColumns.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+from types import MappingProxyType
+import pytest
+from ampel.base.AmpelAlert import AmpelAlert
+from ampel.base.PhotoColumns import PhotoColumns
+
+pps = [
+	{'candid': 1, 'jd': 1., 'magpsf': 18.5, 'fid': 1, 'rb': None},
+	{'candid': 2, 'jd': 2., 'magpsf': 18.2, 'fid': 2, 'rb': 0.8},
+	{'candid': 3, 'jd': 3., 'magpsf': None, 'fid': 1, 'rb': None},
+	{'candid': 4, 'jd': 4., 'magpsf': 17.9, 'fid': 3},
+	{'candid': 5, 'jd': 5., 'magpsf': 3., 'fid': 3, 'rb': None},
+]
+
+filters = [
+	{'attribute': 'rb', 'operator': 'is', 'value': None},
+	{'attribute': 'rb', 'operator': 'is not', 'value': None},
+	{'attribute': 'rb', 'operator': '==', 'value': None},
+	{'attribute': 'rb', 'operator': '!=', 'value': 0.8},
+	{'attribute': 'jd', 'operator': '<', 'value': 3.5},
+	{'attribute': 'fid', 'operator': '==', 'value': (3, 3)},
+	{'attribute': 'fid', 'operator': '!=', 'value': (3, 3, 3)},
+	{'attribute': 'fid', 'operator': '==', 'value': [1, 2]},
+	[{'attribute': 'fid', 'operator': '==', 'value': 1}, {'attribute': 'rb', 'operator': 'is', 'value': None}],
+]
+
+
+def get_alerts():
+	points = tuple(MappingProxyType(pp) for pp in pps)
+	return AmpelAlert('ZTF1', points), AmpelAlert('ZTF1', points, columnar=True)
+
+
+@pytest.mark.parametrize("filter_spec", filters)
+def test_filter_equivalence(filter_spec):
+	alert, col_alert = get_alerts()
+	expected = [dict(el) for el in alert.apply_filter(alert.pps, filter_spec)]
+	assert [dict(el) for el in col_alert.apply_filter(col_alert.pps, filter_spec)] == expected
+
+
+def test_none_comparison():
+	# like with dicts, None values cannot be compared using '<'
+	for al in get_alerts():
+		with pytest.raises(TypeError):
+			al.apply_filter(al.pps, {'attribute': 'magpsf', 'operator': '<', 'value': 18.3})
+
+
+def test_rows():
+	alert, col_alert = get_alerts()
+	for el, row in zip(alert.pps, col_alert.pps):
+		assert dict(row) == dict(el)
+		assert len(row) == len(el)
+		for k in ('rb', 'magpsf', 'unknown'):
+			assert (k in row) == (k in el)
+			assert row.get(k, 'default') == el.get(k, 'default')
+
+
+def test_concatenate_and_select():
+	cols = PhotoColumns.from_dicts(pps)
+	merged, offsets = PhotoColumns.concatenate([cols, pps[:2], [{'candid': 6, 'rb': 0.1}]])
+	assert [dict(row) for row in merged] == pps + pps[:2] + [{'candid': 6, 'rb': 0.1}]
+	assert [dict(row) for row in merged[1:4]] == pps[1:4]
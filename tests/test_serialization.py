@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# File              : tests/test_serialization.py
+# License           : BSD-3-Clause
+# Author            : vb <vbrinnel@physik.hu-berlin.de>
+# Date              : 18.10.2026
+# Last Modified Date: 18.10.2026
+# Last Modified By  : vb <vbrinnel@physik.hu-berlin.de>
+
+import io, json, uuid
+from datetime import datetime, timezone
+from ampel.utils import json_serialization, bson_serialization
+
+doc = {
+	'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+	'ids': [uuid.uuid4(), uuid.uuid4()],
+	'dt': datetime(2018, 10, 18, tzinfo=timezone.utc)
+}
+
+
+def test_json_uuid():
+	buf = io.StringIO()
+	json_serialization.dump([doc], buf)
+	# UUIDs are encoded like with the former bson.json_util.STRICT_JSON_OPTIONS (subtype 3)
+	assert json.loads(buf.getvalue())['id'] == {'$binary': 'EjRWeBI0VngSNFZ4EjRWeA==', '$type': '03'}
+	buf.seek(0)
+	assert list(json_serialization.load(buf)) == [doc]
+
+
+def test_bson_uuid():
+	assert bson_serialization.loads(bson_serialization.dumps(doc)) == doc